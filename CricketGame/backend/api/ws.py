@@ -56,9 +56,7 @@ async def websocket_endpoint(ws: WebSocket, room_code: str, token: str = Query(.
         active = room.players.get(username)
         if active is player:
             room.players.pop(username, None)
-            for team_list in room.teams.values():
-                if username in team_list:
-                    team_list.remove(username)
+            room.set_player_team(username, None)
             print(f"[WS] {username} left room {room_code}")
 
             if not room.players:
@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(scope="session")
+def db_schema():
+    # Created on first use, so collection and DB-free modules never touch the database
+    from .cpu import cpu_learning_schema  # noqa: F401  (register tables on Base)
+    from .data import models  # noqa: F401
+    from .data.database import init_db
+    init_db()
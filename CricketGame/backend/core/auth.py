@@ -252,32 +252,65 @@ def update_player_stats(db: Session, username: str, game_format: str,
        Note: PoTM and PoT are now calculated dynamically from history tables,
        so we don't need to increment counters here.
     """
-    player = db.query(Player).filter(Player.username == username).first()
-    if not player:
+    bulk_update_player_stats(db, game_format, {
+        username: {"batting_data": batting_data, "bowling_data": bowling_data, "won": won},
+    })
+    db.commit()
+
+
+def bulk_update_player_stats(db: Session, game_format: str, entries: dict[str, dict]) -> None:
+    """Update stats for every player of a match in one transaction.
+
+    `entries` maps username -> {"batting_data", "bowling_data", "won"}.
+    Players and their FormatStats rows are loaded with one query each.
+    Nothing is committed here; the caller's session scope owns the transaction.
+    """
+    if not entries:
+        return
+    players = db.query(Player).filter(Player.username.in_(list(entries))).all()
+    if not players:
         return
 
-    fs = db.query(FormatStats).filter(
-        FormatStats.player_id == player.id,
-        FormatStats.format == game_format
-    ).first()
     # Legacy: some users only have a "2v2" row — find and migrate it on first write
-    if not fs and game_format == "team":
-        fs = db.query(FormatStats).filter(
-            FormatStats.player_id == player.id,
-            FormatStats.format == "2v2"
-        ).first()
-        if fs:
-            fs.format = "team"  # Rename in-place for consistency
-    if not fs:
-        fs = FormatStats(player_id=player.id, format=game_format)
-        db.add(fs)
-        db.flush()
+    formats = [game_format, "2v2"] if game_format == "team" else [game_format]
+    rows = db.query(FormatStats).filter(
+        FormatStats.player_id.in_([p.id for p in players]),
+        FormatStats.format.in_(formats),
+    ).order_by(FormatStats.id).all()
+    by_player: dict[int, FormatStats] = {}
+    for fs in rows:
+        current = by_player.get(fs.player_id)
+        if current is None or (current.format != game_format and fs.format == game_format):
+            by_player[fs.player_id] = fs
+
+    created = False
+    for player in players:
+        fs = by_player.get(player.id)
+        if fs is None:
+            fs = FormatStats(player_id=player.id, format=game_format)
+            db.add(fs)
+            by_player[player.id] = fs
+            created = True
+        elif fs.format != game_format:
+            fs.format = game_format  # Rename in-place for consistency
+    if created:
+        db.flush()  # Populate column defaults on new rows
+
+    for player in players:
+        entry = entries[player.username]
+        _apply_match_stats(
+            by_player[player.id],
+            entry.get("batting_data"),
+            entry.get("bowling_data"),
+            bool(entry.get("won")),
+        )
 
+
+def _apply_match_stats(fs: FormatStats, batting_data: Optional[dict],
+                       bowling_data: Optional[dict], won: bool) -> None:
     fs.matches_played += 1
     if won:
         fs.matches_won += 1
-    
-    # Remove manual increment of potm/pot columns as they are now dynamic
 
     if batting_data:
         runs = batting_data.get("runs", 0)
@@ -305,5 +338,3 @@ def update_player_stats(db: Session, username: str, game_format: str,
         if wkts > fs.best_bowling_wickets or (wkts == fs.best_bowling_wickets and runs_c < fs.best_bowling_runs):
             fs.best_bowling_wickets = wkts
             fs.best_bowling_runs = runs_c
-
-    db.commit()
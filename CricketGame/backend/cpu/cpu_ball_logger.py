@@ -5,7 +5,7 @@ import asyncio
 from typing import Optional
 
 from ..data.database import SessionLocal
-from .cpu_learning_integration import log_ball_to_database
+from .cpu_learning_integration import log_ball_to_database, log_balls_to_database
 
 
 def _log_ball_sync(payload: dict) -> None:
@@ -18,6 +18,31 @@ def _log_ball_sync(payload: dict) -> None:
         db.close()
 
 
+def _log_balls_sync(payloads: list) -> None:
+    db = SessionLocal()
+    try:
+        log_balls_to_database(db, payloads)
+    except Exception as e:
+        print(f"[CPU] Error in log_balls_async: {e}")
+    finally:
+        db.close()
+
+
+def _run_in_background(fn, arg) -> None:
+    try:
+        loop = asyncio.get_running_loop()
+        loop.create_task(asyncio.to_thread(fn, arg))
+    except RuntimeError:
+        # Fallback for non-async contexts.
+        fn(arg)
+
+
+def log_balls_async(payloads: list) -> None:
+    """Write a batch of ball payloads in one background thread and DB session."""
+    if payloads:
+        _run_in_background(_log_balls_sync, payloads)
+
+
 def log_ball_async(
     match_id: str,
     ball_number: int,
@@ -60,9 +85,4 @@ def log_ball_async(
         "batting_first": batting_first,
     }
 
-    try:
-        loop = asyncio.get_running_loop()
-        loop.create_task(asyncio.to_thread(_log_ball_sync, payload))
-    except RuntimeError:
-        # Fallback for non-async contexts.
-        _log_ball_sync(payload)
+    _run_in_background(_log_ball_sync, payload)
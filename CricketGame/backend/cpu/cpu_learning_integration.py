@@ -2,7 +2,7 @@
 CPU Learning Integration - Functions to integrate learning into match flow
 """
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from .cpu_learning_schema import MatchBallLog, CPULearningQueue
@@ -37,65 +37,116 @@ def log_ball_to_database(
     Returns:
         The ball_log_id if successful, None otherwise
     """
+    ids = log_balls_to_database(db, [{
+        "match_id": match_id,
+        "ball_number": ball_number,
+        "batter_username": batter_username,
+        "bowler_username": bowler_username,
+        "bat_move": bat_move,
+        "bowl_move": bowl_move,
+        "runs_scored": runs_scored,
+        "is_out": is_out,
+        "match_format_overs": match_format_overs,
+        "current_over": current_over,
+        "total_overs": total_overs,
+        "innings": innings,
+        "batting_score": batting_score,
+        "batting_wickets": batting_wickets,
+        "target": target,
+        "balls_remaining": balls_remaining,
+        "batting_first": batting_first,
+    }])
+    return ids[0] if ids else None
+
+
+def _store_ball_logs(db: Session, ball_logs: List[MatchBallLog]) -> List[int]:
+    """Insert ball logs plus their queue rows with one flush and one commit."""
+    db.add_all(ball_logs)
+    db.flush()  # Assign IDs for the queue rows without committing
+
+    ball_log_ids = [ball_log.id for ball_log in ball_logs]
+    db.add_all([
+        CPULearningQueue(ball_log_id=ball_log_id, processed=False)
+        for ball_log_id in ball_log_ids
+    ])
+    db.commit()
+    return ball_log_ids
+
+
+def log_balls_to_database(db: Session, payloads: List[dict]) -> List[int]:
+    """
+    Log a batch of balls (log_ball_to_database keyword payloads) and queue
+    them for learning, with one flush and one commit for the whole batch.
+    
+    Malformed payloads are skipped; if the batch commit fails, the rows are
+    retried one at a time so a single bad ball cannot drop the rest.
+    
+    Returns:
+        The ball_log_ids of the stored balls, in payload order
+    """
+    if not payloads:
+        return []
+
+    # Usernames repeat across a match's balls; look each one up once
+    user_ids: Dict[str, int] = {}
+
+    def user_id(username: str) -> int:
+        uid = user_ids.get(username)
+        if uid is None:
+            uid = user_ids[username] = get_user_id_from_username(username, db)
+        return uid
+
+    ball_logs = []
+    for p in payloads:
+        try:
+            total_overs = p["total_overs"]
+            ball_logs.append(MatchBallLog(
+                match_id=p["match_id"],
+                ball_number=p["ball_number"],
+                batter_user_id=user_id(p["batter_username"]),
+                bowler_user_id=user_id(p["bowler_username"]),
+                bat_move=p["bat_move"],
+                bowl_move=p["bowl_move"],
+                runs_scored=p["runs_scored"],
+                is_out=p["is_out"],
+                match_format=get_match_format_key(p["match_format_overs"]),
+                current_over=p["current_over"],
+                total_overs=total_overs,
+                innings=p["innings"],
+                batting_score=p["batting_score"],
+                batting_wickets=p["batting_wickets"],
+                target=p["target"],
+                balls_remaining=p["balls_remaining"],
+                game_phase=get_game_phase(p["current_over"], total_overs),
+                score_pressure=get_score_situation(
+                    batting_first=p["batting_first"],
+                    current_score=p["batting_score"],
+                    target=p["target"],
+                    wickets_lost=p["batting_wickets"],
+                    balls_left=p["balls_remaining"],
+                    total_overs=total_overs
+                ),
+            ))
+        except Exception as e:
+            print(f"⚠ Skipping malformed ball payload: {e}")
+
+    ball_log_ids: List[int] = []
     try:
-        # Get user IDs
-        batter_user_id = get_user_id_from_username(batter_username, db)
-        bowler_user_id = get_user_id_from_username(bowler_username, db)
-        
-        # Compute context
-        match_format = get_match_format_key(match_format_overs)
-        game_phase = get_game_phase(current_over, total_overs)
-        score_pressure = get_score_situation(
-            batting_first=batting_first,
-            current_score=batting_score,
-            target=target,
-            wickets_lost=batting_wickets,
-            balls_left=balls_remaining,
-            total_overs=total_overs
-        )
-        
-        # Create ball log entry
-        ball_log = MatchBallLog(
-            match_id=match_id,
-            ball_number=ball_number,
-            batter_user_id=batter_user_id,
-            bowler_user_id=bowler_user_id,
-            bat_move=bat_move,
-            bowl_move=bowl_move,
-            runs_scored=runs_scored,
-            is_out=is_out,
-            match_format=match_format,
-            current_over=current_over,
-            total_overs=total_overs,
-            innings=innings,
-            batting_score=batting_score,
-            batting_wickets=batting_wickets,
-            target=target,
-            balls_remaining=balls_remaining,
-            game_phase=game_phase,
-            score_pressure=score_pressure
-        )
-        
-        db.add(ball_log)
-        db.flush()  # Get the ID without committing
-        
-        ball_log_id = ball_log.id
-        
-        # Add to processing queue
-        queue_item = CPULearningQueue(
-            ball_log_id=ball_log_id,
-            processed=False
-        )
-        db.add(queue_item)
-        
-        db.commit()
-        
-        return ball_log_id
-        
+        ball_log_ids = _store_ball_logs(db, ball_logs)
     except Exception as e:
-        print(f"⚠ Error logging ball to database: {e}")
+        print(f"⚠ Error logging ball batch to database, retrying per ball: {e}")
         db.rollback()
-        return None
+        for ball_log in ball_logs:
+            try:
+                ball_log_ids.extend(_store_ball_logs(db, [ball_log]))
+            except Exception as row_error:
+                print(f"⚠ Error logging ball to database: {row_error}")
+                db.rollback()
+
+    dropped = len(payloads) - len(ball_log_ids)
+    if dropped:
+        print(f"⚠ Dropped {dropped} of {len(payloads)} balls from the learning log")
+    return ball_log_ids
 
 
 def queue_ball_for_learning(db: Session, ball_log_id: int) -> bool:
@@ -208,12 +208,10 @@ def exponential_moving_average_update(
     """
     alpha = 1.0 / min(total_samples + 1, max_samples)
     
-    new_freqs = list(old_freqs)
-    for i in range(7):
-        if i == observed_move:
-            new_freqs[i] = old_freqs[i] * (1 - alpha) + alpha
-        else:
-            new_freqs[i] = old_freqs[i] * (1 - alpha)
+    # Decay every move, then credit the observed one
+    decay = 1 - alpha
+    new_freqs = [f * decay for f in old_freqs]
+    new_freqs[observed_move] += alpha
     
     # Normalize to ensure sum = 1.0
     new_freqs = normalize_frequencies(new_freqs)
@@ -25,6 +25,9 @@ BASE_WEIGHTS = {
     6: 0.15   # High risk, high reward
 }
 
+# Move population for weighted selection
+_MOVES = tuple(range(7))
+
 
 def get_learning_phase(total_balls: int) -> Dict:
     """
@@ -64,14 +67,16 @@ def get_learning_phase(total_balls: int) -> Dict:
 class CPUStrategyEngine:
     """Intelligent CPU opponent using learned patterns."""
     
-    def __init__(self, db_session_factory=None):
+    def __init__(self, db_session_factory=None, rng: Optional[random.Random] = None):
         """
         Initialize the strategy engine.
         
         Args:
             db_session_factory: Factory function to create DB sessions (defaults to SessionLocal)
+            rng: Random source for noise and draws (seed one for reproducible moves)
         """
         self.db_session_factory = db_session_factory or SessionLocal
+        self.rng = rng or random.Random()
     
     def select_move(
         self,
@@ -92,38 +97,53 @@ class CPUStrategyEngine:
         """
         db = self.db_session_factory()
         try:
-            # Step 1: Load all pattern sources
-            global_patterns = self._load_global_patterns(db, match_context)
-            user_patterns = self._load_user_patterns(db, user_id, match_context)
-            situational_patterns = self._load_situational_patterns(db, user_id, match_context)
-            sequence_patterns = self._load_sequence_patterns(db, user_id, match_context, opponent_history)
-            
-            # Get learning phase info
-            total_balls = self._get_total_balls_tracked(db, user_id)
-            phase_info = get_learning_phase(total_balls)
-            
-            # Step 2: Intelligent blending
-            blended = self._blend_patterns(
-                global_patterns, user_patterns, situational_patterns,
-                sequence_patterns, phase_info
-            )
-            
-            # Step 3: Apply role-specific strategy
-            strategic = self._apply_role_strategy(
-                blended, match_context, opponent_history, phase_info['confidence']
-            )
-            
-            # Step 4: Add strategic noise (anti-exploitation)
-            noisy = self._add_strategic_noise(strategic, phase_info['confidence'])
-            
-            # Step 5: Weighted random selection
-            return self._weighted_choice(noisy)
-            
+            strategic, confidence = self._strategic_weights(db, user_id, match_context, opponent_history)
         finally:
             db.close()
+        
+        # Step 4: Add strategic noise (anti-exploitation)
+        noisy = self._add_strategic_noise(strategic, confidence)
+        
+        # Step 5: Weighted random selection
+        return self._weighted_choice(noisy)
     
-    def _load_global_patterns(self, db: Session, context: Dict) -> Dict[int, float]:
-        """Load global patterns from database."""
+    def _strategic_weights(
+        self,
+        db: Session,
+        user_id: int,
+        match_context: Dict,
+        opponent_history: List[int]
+    ) -> Tuple[Dict[int, float], float]:
+        """Blended, role-adjusted weights before noise, plus the learning confidence."""
+        # Every pattern source and strategy keys off the same phase and pressure
+        game_phase, score_pressure = self._situation(match_context)
+        
+        # Step 1: Load all pattern sources
+        global_patterns = self._load_global_patterns(db, match_context, game_phase, score_pressure)
+        user_patterns = self._load_user_patterns(db, user_id, match_context)
+        situational_patterns = self._load_situational_patterns(
+            db, user_id, match_context, game_phase, score_pressure
+        )
+        sequence_patterns = self._load_sequence_patterns(db, user_id, match_context, opponent_history)
+        
+        # Get learning phase info
+        total_balls = self._get_total_balls_tracked(db, user_id)
+        phase_info = get_learning_phase(total_balls)
+        
+        # Step 2: Intelligent blending
+        blended = self._blend_patterns(
+            global_patterns, user_patterns, situational_patterns,
+            sequence_patterns, phase_info
+        )
+        
+        # Step 3: Apply role-specific strategy
+        strategic = self._apply_role_strategy(
+            blended, match_context, opponent_history, phase_info['confidence'], score_pressure
+        )
+        return strategic, phase_info['confidence']
+    
+    def _situation(self, context: Dict) -> Tuple[str, str]:
+        """(game phase, score pressure) for a match context."""
         game_phase = get_game_phase(context['current_over'], context['total_overs'])
         score_pressure = get_score_situation(
             batting_first=context['batting_first'],
@@ -133,7 +153,12 @@ class CPUStrategyEngine:
             balls_left=context['balls_left'],
             total_overs=context['total_overs']
         )
-        
+        return game_phase, score_pressure
+    
+    def _load_global_patterns(
+        self, db: Session, context: Dict, game_phase: str, score_pressure: str
+    ) -> Dict[int, float]:
+        """Load global patterns from database."""
         pattern = db.query(CPUGlobalPattern).filter(
             CPUGlobalPattern.match_format == context['match_format'],
             CPUGlobalPattern.game_phase == game_phase,
@@ -196,20 +221,13 @@ class CPUStrategyEngine:
                 6: profile.bowl_num_6_freq
             }
     
-    def _load_situational_patterns(self, db: Session, user_id: int, context: Dict) -> Dict[int, float]:
+    def _load_situational_patterns(
+        self, db: Session, user_id: int, context: Dict, game_phase: str, score_pressure: str
+    ) -> Dict[int, float]:
         """Load context-specific patterns."""
         if user_id == -1:
             return {i: 1.0/7 for i in range(7)}
         
-        game_phase = get_game_phase(context['current_over'], context['total_overs'])
-        score_pressure = get_score_situation(
-            batting_first=context['batting_first'],
-            current_score=context['current_score'],
-            target=context.get('target'),
-            wickets_lost=context['wickets_lost'],
-            balls_left=context['balls_left'],
-            total_overs=context['total_overs']
-        )
         recent_event = get_recent_event(context.get('last_3_results', []))
         
         # Get opponent's role (opposite of CPU)
@@ -324,17 +342,18 @@ class CPUStrategyEngine:
         weights: Dict[int, float],
         context: Dict,
         opponent_history: List[int],
-        confidence: float
+        confidence: float,
+        score_pressure: str
     ) -> Dict[int, float]:
         """Apply role-specific strategic adjustments."""
         strategic = dict(weights)
         
         if context['role'] == 'bowling':
             # CPU is BOWLING - trying to get user out
-            strategic = self._bowling_strategy(strategic, opponent_history, context, confidence)
+            strategic = self._bowling_strategy(strategic, opponent_history, context, confidence, score_pressure)
         else:
             # CPU is BATTING - trying to score without getting out
-            strategic = self._batting_strategy(strategic, opponent_history, context, confidence)
+            strategic = self._batting_strategy(strategic, opponent_history, context, confidence, score_pressure)
         
         # Normalize
         total = sum(strategic.values())
@@ -348,7 +367,8 @@ class CPUStrategyEngine:
         weights: Dict[int, float],
         opponent_history: List[int],
         context: Dict,
-        confidence: float
+        confidence: float,
+        score_pressure: str
     ) -> Dict[int, float]:
         """Bowling strategy: Target opponent's favorite batting numbers."""
         strategic = dict(weights)
@@ -367,15 +387,6 @@ class CPUStrategyEngine:
                 strategic[num] *= (1 + boost_factor * 0.5)
         
         # Situational adjustments
-        score_pressure = get_score_situation(
-            batting_first=context['batting_first'],
-            current_score=context['current_score'],
-            target=context.get('target'),
-            wickets_lost=context['wickets_lost'],
-            balls_left=context['balls_left'],
-            total_overs=context['total_overs']
-        )
-        
         if context['wickets_lost'] >= 7:
             # Opponent is desperate
             strategic[0] *= 1.3  # They'll play more 0s
@@ -394,7 +405,8 @@ class CPUStrategyEngine:
         weights: Dict[int, float],
         opponent_history: List[int],
         context: Dict,
-        confidence: float
+        confidence: float,
+        score_pressure: str
     ) -> Dict[int, float]:
         """Batting strategy: Avoid opponent's favorite bowling numbers."""
         strategic = dict(weights)
@@ -413,15 +425,6 @@ class CPUStrategyEngine:
                 strategic[num] *= avoid_factor
         
         # Situational adjustments based on score pressure
-        score_pressure = get_score_situation(
-            batting_first=context['batting_first'],
-            current_score=context['current_score'],
-            target=context.get('target'),
-            wickets_lost=context['wickets_lost'],
-            balls_left=context['balls_left'],
-            total_overs=context['total_overs']
-        )
-        
         if 'desperate' in score_pressure or 'very_tight' in score_pressure:
             # Need quick runs
             strategic[5] *= 1.4
@@ -456,14 +459,14 @@ class CPUStrategyEngine:
         
         # Random perturbation
         for num in range(7):
-            noise = random.uniform(-noise_factor, noise_factor)
+            noise = self.rng.uniform(-noise_factor, noise_factor)
             noisy[num] = max(0.01, weights[num] + noise)
         
         # Occasional bluff (5% chance at high confidence)
-        if random.random() < 0.05 * confidence:
+        if self.rng.random() < 0.05 * confidence:
             # Pick a low-probability number and boost it
             sorted_by_prob = sorted(noisy.items(), key=lambda x: x[1])
-            bluff_num = sorted_by_prob[random.randint(0, 2)][0]
+            bluff_num = sorted_by_prob[self.rng.randint(0, 2)][0]
             noisy[bluff_num] *= 3
         
         # Normalize
@@ -475,19 +478,10 @@ class CPUStrategyEngine:
     
     def _weighted_choice(self, weights: Dict[int, float]) -> int:
         """Select a number using weighted random selection."""
-        total = sum(weights.values())
-        if total <= 0:
-            return random.randint(0, 6)
-        
-        r = random.uniform(0, total)
-        cumsum = 0
-        
-        for num in range(7):
-            cumsum += weights[num]
-            if r <= cumsum:
-                return num
-        
-        return 6  # Fallback
+        w = [weights[num] for num in range(7)]
+        if sum(w) <= 0:
+            return self.rng.randint(0, 6)
+        return self.rng.choices(_MOVES, weights=w)[0]
     
     def get_cpu_status(self, user_id: int) -> Dict:
         """
@@ -1,12 +1,16 @@
 """
 Database — SQLAlchemy engine, session, and base model.
 """
+from contextlib import contextmanager
+from typing import Iterator
+
 from sqlalchemy import create_engine, inspect, text
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 
 from ..core.config import DATABASE_URL
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# pool_pre_ping swaps out stale pooled connections instead of failing the next commit
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 # Global learning processor instance
@@ -26,6 +30,20 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """One unit of work: committed on success, rolled back on error, always closed."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def init_db() -> None:
     """Create all tables if they don't exist."""
     Base.metadata.create_all(bind=engine)
@@ -2,6 +2,8 @@
 ORM Models — Player, per-format statistics, match history, tournament history.
 """
 import json
+
+import orjson
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, func
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -10,6 +12,11 @@ from .database import Base
 from ..cpu import cpu_learning_schema
 
 
+def dump_json(value) -> str:
+    """Serialize a value for one of the JSON text columns below."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class Player(Base):
     __tablename__ = "players"
 
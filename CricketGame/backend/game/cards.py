@@ -11,18 +11,22 @@ class BattingCard:
         self.sixes = 0
         self.dismissal = "not out"
         self.is_out = False
+        self._dict = None  # rendered to_dict(); cleared by Innings.resolve_ball
 
     @property
     def strike_rate(self) -> float:
         return (self.runs / self.balls * 100) if self.balls > 0 else 0.0
 
     def to_dict(self) -> dict:
-        return {
-            "name": self.name, "runs": self.runs, "balls": self.balls,
-            "fours": self.fours, "sixes": self.sixes,
-            "sr": round(self.strike_rate, 1), "dismissal": self.dismissal,
-            "is_out": self.is_out,
-        }
+        """Cached and shared by every caller; treat as read-only and copy to keep it."""
+        if self._dict is None:
+            self._dict = {
+                "name": self.name, "runs": self.runs, "balls": self.balls,
+                "fours": self.fours, "sixes": self.sixes,
+                "sr": round(self.strike_rate, 1), "dismissal": self.dismissal,
+                "is_out": self.is_out,
+            }
+        return self._dict
 
 
 class BowlingCard:
@@ -33,6 +37,7 @@ class BowlingCard:
         self.balls_bowled_in_over = 0
         self.runs_conceded = 0
         self.wickets = 0
+        self._dict = None  # rendered to_dict(); cleared by Innings.resolve_ball
 
     @property
     def total_balls(self) -> int:
@@ -50,8 +55,11 @@ class BowlingCard:
         return (self.runs_conceded / total_overs) if total_overs > 0 else 0.0
 
     def to_dict(self) -> dict:
-        return {
-            "name": self.name, "overs": self.overs_display,
-            "runs": self.runs_conceded, "wickets": self.wickets,
-            "econ": round(self.economy, 1),
-        }
+        """Cached and shared by every caller; treat as read-only and copy to keep it."""
+        if self._dict is None:
+            self._dict = {
+                "name": self.name, "overs": self.overs_display,
+                "runs": self.runs_conceded, "wickets": self.wickets,
+                "econ": round(self.economy, 1),
+            }
+        return self._dict
@@ -1,5 +1,5 @@
 from .cards import BattingCard, BowlingCard
-from .innings import Innings
+from .innings import Innings, PickOptions
 from .match import Match
 from .awards import compute_potm, compute_tournament_awards
 
@@ -7,6 +7,7 @@ __all__ = [
     "BattingCard",
     "BowlingCard",
     "Innings",
+    "PickOptions",
     "Match",
     "compute_potm",
     "compute_tournament_awards",
@@ -1,15 +1,42 @@
-from typing import Optional, Dict, List
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, List, FrozenSet
 from .cards import BattingCard, BowlingCard
 
 
+@dataclass(frozen=True)
+class PickOptions:
+    """Captain pick options plus the names a pick may use and the default choice."""
+    options: List[dict]
+    valid_names: FrozenSet[str]
+    first_choice: Optional[str]
+
+    @classmethod
+    def from_options(cls, options: List[dict]) -> "PickOptions":
+        enabled = [o["player"] for o in options if not o["disabled"]]
+        names = enabled or [o["player"] for o in options]
+        return cls(options, frozenset(names), names[0] if names else None)
+
+
 class Innings:
     """Represents one innings of a match."""
+    __slots__ = (
+        "batting_side", "bowling_side", "total_overs", "total_balls", "total_wickets", "target",
+        "is_team_mode", "batting_cards", "striker_idx", "non_striker_idx", "wickets_fallen",
+        "bowling_cards", "current_bowler_idx", "overs_completed", "balls_in_over", "total_runs",
+        "ball_log", "_bat_history", "_bowl_history", "_recent_results",
+        "_wicket_streak_bowler", "_wicket_streak", "is_complete", "_scorecard", "_scorecard_balls",
+        "_selection_epoch", "_batter_picks", "_batter_picks_key", "_bowler_picks", "_bowler_picks_key",
+        "last_batter_out", "last_bowler", "needs_batter_choice", "needs_bowler_choice",
+    )
+
     def __init__(self, batting_side: List[str], bowling_side: List[str],
                  total_overs: int, total_wickets: int, target: Optional[int] = None,
                  is_team_mode: bool = False):
         self.batting_side = batting_side
         self.bowling_side = bowling_side
         self.total_overs = total_overs
+        self.total_balls = total_overs * 6
         self.total_wickets = total_wickets
         self.target = target
         self.is_team_mode = is_team_mode  # Enables captain selection pauses
@@ -27,7 +54,24 @@ class Innings:
         self.balls_in_over = 0
         self.total_runs = 0
         self.ball_log: List[dict] = []
+        # Rolling move/result windows read by the CPU strategy picker
+        self._bat_history: deque = deque(maxlen=20)
+        self._bowl_history: deque = deque(maxlen=20)
+        self._recent_results: deque = deque(maxlen=3)
+        # Consecutive-wicket streak for hat-trick detection (bowler, count)
+        self._wicket_streak_bowler: Optional[str] = None
+        self._wicket_streak = 0
         self.is_complete = False
+        # Last rendered scorecard and the ball count it reflects
+        self._scorecard: Optional[dict] = None
+        self._scorecard_balls = -1
+        # Pick options memoized on the state they are derived from;
+        # the epoch moves on every wicket and captain pick
+        self._selection_epoch = 0
+        self._batter_picks: Optional[PickOptions] = None
+        self._batter_picks_key = None
+        self._bowler_picks: Optional[PickOptions] = None
+        self._bowler_picks_key = None
 
         # Captain selection state (team mode only)
         self.last_batter_out: Optional[str] = None
@@ -49,6 +93,15 @@ class Innings:
     def current_bowler(self) -> str:
         return self.bowling_side[self.current_bowler_idx]
 
+    def recent_moves(self, role: str) -> List[int]:
+        """The last (up to 20) moves played in *role* ("bat" or "bowl"), oldest first."""
+        return list(self._bat_history if role == "bat" else self._bowl_history)
+
+    @property
+    def recent_results(self) -> List[dict]:
+        """The last (up to 3) ball outcomes as {"runs", "is_out"}, oldest first."""
+        return list(self._recent_results)
+
     @property
     def overs_display(self) -> str:
         if self.balls_in_over == 0:
@@ -82,6 +135,9 @@ class Innings:
 
         bat_card = self.batting_cards[self.striker]
         bowl_card = self.bowling_cards[self.current_bowler]
+        # Only these two cards change this ball
+        bat_card._dict = None
+        bowl_card._dict = None
 
         bat_card.balls += 1
         bowl_card.balls_bowled_in_over += 1
@@ -95,14 +151,16 @@ class Innings:
             bowl_card.wickets += 1
             self.wickets_fallen += 1
             # Hat-trick detection: did current bowler just take their 3rd consecutive wicket?
-            if len(self.ball_log) >= 2:
-                prev1 = self.ball_log[-1]
-                prev2 = self.ball_log[-2]
-                if (prev1.get("is_out") and prev1.get("bowler") == self.current_bowler
-                        and prev2.get("is_out") and prev2.get("bowler") == self.current_bowler):
-                    result["hat_trick"] = True
+            if self._wicket_streak_bowler == self.current_bowler:
+                self._wicket_streak += 1
+            else:
+                self._wicket_streak_bowler = self.current_bowler
+                self._wicket_streak = 1
+            if self._wicket_streak >= 3:
+                result["hat_trick"] = True
             self._handle_wicket_fall(result)
         else:
+            self._wicket_streak = 0
             runs = bowl_move if bat_move == 0 else bat_move
             result["runs"] = runs
             old_runs = bat_card.runs
@@ -146,6 +204,9 @@ class Innings:
                 result["target_chased"] = True
 
         self.ball_log.append(result)
+        self._bat_history.append(bat_move)
+        self._bowl_history.append(bowl_move)
+        self._recent_results.append({"runs": result["runs"], "is_out": result["is_out"]})
         return result
 
     def _handle_wicket_fall(self, result: dict) -> None:
@@ -165,8 +226,9 @@ class Innings:
         # In team mode: captain picks the new non-striker
         if self.is_team_mode and len(self.batting_side) > 1:
             self.needs_batter_choice = True
+            self._selection_epoch += 1
             result["needs_batter_choice"] = True
-            result["available_batters"] = self.available_next_batters()
+            result["available_batters"] = self.batter_pick_options().options
         else:
             # Auto-advance: pick first available player
             available = [
@@ -186,7 +248,7 @@ class Innings:
             self.needs_bowler_choice = True
             if result is not None:
                 result["needs_bowler_choice"] = True
-                result["available_bowlers"] = self.available_next_bowlers()
+                result["available_bowlers"] = self.bowler_pick_options().options
         elif len(self.bowling_side) > 1:
             self.current_bowler_idx = (self.current_bowler_idx + 1) % len(self.bowling_side)
 
@@ -232,6 +294,21 @@ class Innings:
                 o["disabled"] = False
         return options
 
+    def batter_pick_options(self) -> PickOptions:
+        """Memoized available_next_batters() for the current pick."""
+        key = (self._selection_epoch, self.needs_batter_choice, self.striker_idx, self.non_striker_idx)
+        if self._batter_picks_key != key:
+            self._batter_picks = PickOptions.from_options(self.available_next_batters())
+            self._batter_picks_key = key
+        return self._batter_picks
+
+    def bowler_pick_options(self) -> PickOptions:
+        """Memoized available_next_bowlers() for the current pick."""
+        if self._bowler_picks is None or self._bowler_picks_key != self.last_bowler:
+            self._bowler_picks = PickOptions.from_options(self.available_next_bowlers())
+            self._bowler_picks_key = self.last_bowler
+        return self._bowler_picks
+
     def apply_batter_choice(self, player: str) -> None:
         """Captain confirmed next batter. Sets them as striker if it's ball 1, else non-striker."""
         if player not in self.batting_side:
@@ -254,6 +331,7 @@ class Innings:
             self.non_striker_idx = idx
         
         self.needs_batter_choice = False
+        self._selection_epoch += 1
 
     def apply_bowler_choice(self, player: str) -> None:
         """Captain confirmed next bowler. Updates current_bowler_idx."""
@@ -272,14 +350,22 @@ class Innings:
         return False
 
     def get_scorecard(self) -> dict:
-        return {
-            "batting": [self.batting_cards[n].to_dict() for n in self.batting_side],
-            "bowling": [self.bowling_cards[n].to_dict() for n in self.bowling_side],
+        """Render the scorecard. The same dict is returned until another ball is bowled."""
+        balls = len(self.ball_log)
+        if self._scorecard is not None and self._scorecard_balls == balls:
+            return self._scorecard
+        # Card dicts are built from the sides and never re-keyed, so they keep side order
+        scorecard = {
+            "batting": [card.to_dict() for card in self.batting_cards.values()],
+            "bowling": [card.to_dict() for card in self.bowling_cards.values()],
             "total_runs": self.total_runs,
             "wickets": self.wickets_fallen,
             "overs": self.overs_display,
             "target": self.target,
         }
+        self._scorecard = scorecard
+        self._scorecard_balls = balls
+        return scorecard
 
     def get_boundary_count(self) -> int:
         return sum(card.fours + card.sixes for card in self.batting_cards.values())
@@ -1,18 +1,73 @@
-import copy
 import random
 from typing import Any, Dict, List, Optional
 from .innings import Innings
 
+_COIN_FACES = ("heads", "tails")
+
+# Result text templates, formatted on first read of Match.result_text
+_RESULT_TEMPLATES = {
+    "wickets": "{} won by {} wicket(s)",
+    "runs": "{} won by {} run(s)",
+    "tie": "Match Tied!",
+    "super_over": "SUPER OVER: {} won!",
+    "super_over_tie": "SUPER OVER TIED!",
+}
+
+
+def _copy_scorecard(scorecard: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an Innings.get_scorecard() dict, including its per-player rows."""
+    return {
+        **scorecard,
+        "batting": [dict(row) for row in scorecard.get("batting", [])],
+        "bowling": [dict(row) for row in scorecard.get("bowling", [])],
+    }
+
+
+def _official_overs_faced(innings: Optional[Innings]) -> float:
+    if not innings:
+        return 0.0
+    balls_faced = innings.overs_completed * 6 + innings.balls_in_over
+    # Official NRR convention: if all out early, count full quota overs.
+    # Compared in balls so the float conversion only happens for the result.
+    if innings.wickets_fallen >= innings.total_wickets and balls_faced < innings.total_overs * 6:
+        return float(innings.total_overs)
+    return balls_faced / 6.0
+
+
+def _innings_slot(index: int) -> property:
+    """Named accessor (innings_1..innings_4) over Match.innings."""
+    def fget(self) -> Optional[Innings]:
+        return self.innings[index]
+
+    def fset(self, value: Optional[Innings]) -> None:
+        self.innings[index] = value
+
+    return property(fget, fset)
+
 
 class Match:
     """Full match container: toss, 2 innings, result."""
+    __slots__ = (
+        "id", "mode", "_is_team_mode", "side_a", "side_b", "_side_a_set", "_all_players",
+        "total_overs", "total_wickets",
+        "toss_caller", "toss_winner", "toss_choice",
+        "batting_first", "bowling_first", "_bat_first_label", "_bat_second_label",
+        "innings",
+        "is_super_over", "super_over_round", "super_over_rounds", "current_innings",
+        "winner", "_result_text", "_result_parts", "is_finished", "nrr_locked",
+    )
+
     def __init__(self, match_id: str, mode: str,
                  side_a: List[str], side_b: List[str],
                  total_overs: int, total_wickets: int):
         self.id = match_id
         self.mode = mode
+        self._is_team_mode = (mode == "team")
         self.side_a = side_a
         self.side_b = side_b
+        # Hashed side A membership for toss/result lookups
+        self._side_a_set = frozenset(side_a)
+        self._all_players = tuple(side_a) + tuple(side_b)
         self.total_overs = total_overs
         self.total_wickets = total_wickets
         self.toss_caller: Optional[str] = None
@@ -20,20 +75,27 @@ class Match:
         self.toss_choice: Optional[str] = None
         self.batting_first: Optional[List[str]] = None
         self.bowling_first: Optional[List[str]] = None
-        self.innings_1: Optional[Innings] = None
-        self.innings_2: Optional[Innings] = None
-        self.innings_3: Optional[Innings] = None
-        self.innings_4: Optional[Innings] = None
+        # Display labels for the two sides, fixed once the toss is decided
+        self._bat_first_label = ""
+        self._bat_second_label = ""
+        # Innings 1-4 by position; 3 and 4 are the super-over innings.
+        self.innings: List[Optional[Innings]] = [None, None, None, None]
         self.is_super_over: bool = False
         self.super_over_round: int = 0
         self.super_over_rounds: List[Dict[str, Any]] = []
         self.current_innings: int = 0
         self.winner: Optional[str] = None
-        self.result_text = ""
+        self._result_text: Optional[str] = ""
+        self._result_parts: Optional[tuple] = None
         self.is_finished = False
         # When True, tournament standings should not consume this match for NRR.
         self.nrr_locked = False
 
+    innings_1 = _innings_slot(0)
+    innings_2 = _innings_slot(1)
+    innings_3 = _innings_slot(2)
+    innings_4 = _innings_slot(3)
+
     def snapshot_super_over_round(self) -> Optional[Dict[str, Any]]:
         """Capture the completed super-over round (innings 3 + 4)."""
         if not self.innings_3 or not self.innings_4:
@@ -45,8 +107,8 @@ class Match:
 
         score_3 = self.innings_3.total_runs
         score_4 = self.innings_4.total_runs
-        bat_first_label = ", ".join(self.batting_first or [])
-        bat_second_label = ", ".join(self.bowling_first or [])
+        bat_first_label = self._bat_first_label
+        bat_second_label = self._bat_second_label
 
         round_winner: Optional[str] = None
         is_tied_round = score_3 == score_4
@@ -57,8 +119,9 @@ class Match:
 
         snapshot: Dict[str, Any] = {
             "round": round_no,
-            "scorecard_3": self.innings_3.get_scorecard(),
-            "scorecard_4": self.innings_4.get_scorecard(),
+            # Copied: the card rows are the innings' cached dicts
+            "scorecard_3": _copy_scorecard(self.innings_3.get_scorecard()),
+            "scorecard_4": _copy_scorecard(self.innings_4.get_scorecard()),
             "bat_team_3": list(self.bowling_first or []),
             "bat_team_4": list(self.batting_first or []),
             "is_tied_round": is_tied_round,
@@ -69,18 +132,23 @@ class Match:
 
     def get_super_over_timeline(self) -> List[Dict[str, Any]]:
         """Return a detached copy of all recorded super-over rounds."""
-        return copy.deepcopy(self.super_over_rounds)
+        return [
+            {
+                **r,
+                "scorecard_3": _copy_scorecard(r["scorecard_3"]),
+                "scorecard_4": _copy_scorecard(r["scorecard_4"]),
+                "bat_team_3": list(r["bat_team_3"]),
+                "bat_team_4": list(r["bat_team_4"]),
+            }
+            for r in self.super_over_rounds
+        ]
 
     def do_toss(self, caller: Optional[str] = None) -> dict:
-        if caller:
-            self.toss_caller = caller
-        else:
-            all_players = self.side_a + self.side_b
-            self.toss_caller = random.choice(all_players)
+        self.toss_caller = caller if caller else random.choice(self._all_players)
         return {"caller": self.toss_caller}
 
     def resolve_toss(self, call: str, other_side_chooser: Optional[str] = None) -> dict:
-        coin = random.choice(["heads", "tails"])
+        coin = _COIN_FACES[random.getrandbits(1)]
         won = (call == coin)
         if won:
             self.toss_winner = self.toss_caller
@@ -93,7 +161,7 @@ class Match:
 
     def apply_toss_choice(self, choice: str) -> None:
         self.toss_choice = choice
-        winner_side = self.side_a if self.toss_winner in self.side_a else self.side_b
+        winner_side = self.side_a if self.toss_winner in self._side_a_set else self.side_b
         loser_side = self.side_b if winner_side == self.side_a else self.side_a
 
         if choice == "bat":
@@ -102,6 +170,8 @@ class Match:
         else:
             self.batting_first = loser_side
             self.bowling_first = winner_side
+        self._bat_first_label = ", ".join(self.batting_first)
+        self._bat_second_label = ", ".join(self.bowling_first)
 
     def start_innings_1(self) -> None:
         self.current_innings = 1
@@ -110,7 +180,7 @@ class Match:
             bowling_side=self.bowling_first,
             total_overs=self.total_overs,
             total_wickets=self.total_wickets,
-            is_team_mode=(self.mode == "team"),
+            is_team_mode=self._is_team_mode,
         )
 
     def start_innings_2(self) -> None:
@@ -122,7 +192,7 @@ class Match:
             total_overs=self.total_overs,
             total_wickets=self.total_wickets,
             target=target,
-            is_team_mode=(self.mode == "team"),
+            is_team_mode=self._is_team_mode,
         )
 
     def start_innings_3(self) -> None:
@@ -135,7 +205,7 @@ class Match:
             bowling_side=self.batting_first,
             total_overs=1,
             total_wickets=2,
-            is_team_mode=(self.mode == "team"),
+            is_team_mode=self._is_team_mode,
         )
 
     def start_innings_4(self) -> None:
@@ -147,87 +217,97 @@ class Match:
             total_overs=1,
             total_wickets=2,
             target=target,
-            is_team_mode=(self.mode == "team"),
+            is_team_mode=self._is_team_mode,
         )
 
     @property
     def active_innings(self) -> Optional[Innings]:
-        if self.current_innings == 1:
-            return self.innings_1
-        elif self.current_innings == 2:
-            return self.innings_2
-        elif self.current_innings == 3:
-            return self.innings_3
-        elif self.current_innings == 4:
-            return self.innings_4
-        return None
+        if not self.current_innings:
+            return None
+        return self.innings[self.current_innings - 1]
 
-    def determine_result(self) -> dict:
-        bat_first_label = ", ".join(self.batting_first)
-        bat_second_label = ", ".join(self.bowling_first)
+    @property
+    def result_text(self) -> str:
+        if self._result_text is None:
+            key, *args = self._result_parts
+            self._result_text = _RESULT_TEMPLATES[key].format(*args)
+        return self._result_text
 
+    @result_text.setter
+    def result_text(self, text: str) -> None:
+        self._result_text = text
+        self._result_parts = None
+
+    def decide_result(self) -> None:
+        """Set winner and finish the match without rendering any payload.
+
+        The result text is only formatted when `result_text` is read, so
+        headless simulations that only need the winner skip it entirely.
+        """
+        bat_first_label = self._bat_first_label
+        bat_second_label = self._bat_second_label
+
+        # Scores are paired as (side that batted first, side that batted second).
+        # In a super over the chasing side bats first (innings 3).
         if not self.is_super_over:
-            s1 = self.innings_1.total_runs
-            s2 = self.innings_2.total_runs
-
-            if s2 > s1:
-                remaining_wickets = self.total_wickets - self.innings_2.wickets_fallen
-                self.winner = bat_second_label
-                self.result_text = f"{bat_second_label} won by {remaining_wickets} wicket(s)"
-            elif s1 > s2:
-                margin = s1 - s2
-                self.winner = bat_first_label
-                self.result_text = f"{bat_first_label} won by {margin} run(s)"
-            else:
-                self.winner = "TIE"
-                self.result_text = "Match Tied!"
+            first_score = self.innings_1.total_runs
+            second_score = self.innings_2.total_runs
         else:
-            s3 = self.innings_3.total_runs
-            s4 = self.innings_4.total_runs if getattr(self, "innings_4", None) else 0
-
-            if s4 > s3:
-                self.winner = bat_first_label
-                self.result_text = f"SUPER OVER: {bat_first_label} won!"
-            elif s3 > s4:
-                self.winner = bat_second_label
-                self.result_text = f"SUPER OVER: {bat_second_label} won!"
-            else:
-                self.winner = "TIE"
-                self.result_text = "SUPER OVER TIED!"
+            first_score = self.innings_4.total_runs if self.innings_4 else 0
+            second_score = self.innings_3.total_runs
+
+        diff = second_score - first_score
+        # 1 → side batting second won, -1 → side batting first won, 0 → tie
+        outcome = (diff > 0) - (diff < 0)
+        self.winner = ("TIE", bat_second_label, bat_first_label)[outcome]
 
+        if self.is_super_over:
+            parts = ("super_over", self.winner) if outcome else ("super_over_tie",)
+        elif outcome > 0:
+            parts = ("wickets", bat_second_label, self.total_wickets - self.innings_2.wickets_fallen)
+        elif outcome < 0:
+            parts = ("runs", bat_first_label, -diff)
+        else:
+            parts = ("tie",)
+        self._result_parts = parts
+        self._result_text = None
         self.is_finished = True
-        result = {
+
+    def determine_result(self) -> dict:
+        self.decide_result()
+        sc1 = self.innings_1.get_scorecard() if self.innings_1 else {}
+        sc2 = self.innings_2.get_scorecard() if self.innings_2 else {}
+
+        # Each shape is built as one literal so the dict is sized once.
+        if not self.is_super_over:
+            return {
+                "winner": self.winner,
+                "result_text": self.result_text,
+                "scorecard_1": sc1,
+                "scorecard_2": sc2,
+                "side_a": self.side_a,
+                "side_b": self.side_b,
+                "bat_team_1": self.batting_first,
+                "bat_team_2": self.bowling_first,
+            }
+
+        return {
             "winner": self.winner,
             "result_text": self.result_text,
-            "scorecard_1": self.innings_1.get_scorecard() if getattr(self, "innings_1", None) else {},
-            "scorecard_2": self.innings_2.get_scorecard() if getattr(self, "innings_2", None) else {},
+            "scorecard_1": sc1,
+            "scorecard_2": sc2,
             "side_a": self.side_a,
             "side_b": self.side_b,
             "bat_team_1": self.batting_first,
             "bat_team_2": self.bowling_first,
+            "scorecard_3": self.innings_3.get_scorecard() if self.innings_3 else {},
+            "scorecard_4": self.innings_4.get_scorecard() if self.innings_4 else {},
+            "bat_team_3": self.bowling_first,
+            "bat_team_4": self.batting_first,
+            "super_over_timeline": self.get_super_over_timeline(),
         }
 
-        if self.is_super_over:
-            result["scorecard_3"] = self.innings_3.get_scorecard() if getattr(self, "innings_3", None) else {}
-            result["scorecard_4"] = self.innings_4.get_scorecard() if getattr(self, "innings_4", None) else {}
-            result["bat_team_3"] = self.bowling_first
-            result["bat_team_4"] = self.batting_first
-            result["super_over_timeline"] = self.get_super_over_timeline()
-
-        return result
-
     def get_nrr_data(self) -> dict:
-        def _official_overs_faced(innings: Optional[Innings]) -> float:
-            if not innings:
-                return 0.0
-            balls_faced = innings.overs_completed * 6 + innings.balls_in_over
-            full_quota_overs = float(innings.total_overs)
-            actual_overs = balls_faced / 6.0
-            # Official NRR convention: if all out early, count full quota overs.
-            if innings.wickets_fallen >= innings.total_wickets and actual_overs < full_quota_overs:
-                return full_quota_overs
-            return actual_overs
-
         return {
             "runs_scored_1": self.innings_1.total_runs if self.innings_1 else 0,
             "overs_faced_1": _official_overs_faced(self.innings_1),
@@ -237,6 +317,6 @@ class Match:
         }
 
     def _other_side_player(self, player: str) -> str:
-        if player in self.side_a:
+        if player in self._side_a_set:
             return self.side_b[0]
         return self.side_a[0]
@@ -8,10 +8,16 @@ Playoff format:
   FINAL:       Winner Q1 vs Winner Q2
 """
 
+from operator import attrgetter
 from typing import List, Dict, Optional, Any
 
 
 class StandingsEntry:
+    __slots__ = (
+        "player", "played", "won", "lost", "tied", "points",
+        "runs_scored", "overs_faced", "runs_conceded", "overs_bowled", "nrr",
+    )
+
     def __init__(self, player: str):
         self.player = player
         self.played = 0
@@ -23,13 +29,14 @@ class StandingsEntry:
         self.overs_faced = 0.0
         self.runs_conceded = 0
         self.overs_bowled = 0.0
+        # Cached NRR, refreshed whenever the run/over totals change
+        self.nrr = 0.0
 
-    @property
-    def nrr(self) -> float:
+    def update_nrr(self) -> None:
         """Net Run Rate = (Runs scored / Overs faced) - (Runs conceded / Overs bowled)."""
         scoring_rate = (self.runs_scored / self.overs_faced) if self.overs_faced > 0 else 0
         conceding_rate = (self.runs_conceded / self.overs_bowled) if self.overs_bowled > 0 else 0
-        return scoring_rate - conceding_rate
+        self.nrr = scoring_rate - conceding_rate
 
     def to_dict(self) -> dict:
         return {
@@ -63,6 +70,10 @@ class Tournament:
         self.standings: Dict[str, StandingsEntry] = {
             p: StandingsEntry(p) for p in players
         }
+        # Sorted standings rows, rebuilt only after a group result changes them
+        self._standings_cache: Optional[List[dict]] = None
+        # payload() results keyed by skip_current; dropped by _invalidate_payload on every result
+        self._payload_cache: Dict[bool, dict] = {}
 
         # Playoff state
         self.phase = self.PHASE_GROUP
@@ -133,6 +144,11 @@ class Tournament:
                 sa.runs_conceded += nrr_data.get("runs_scored_1", 0)
                 sa.overs_bowled += nrr_data.get("overs_faced_1", 0)
 
+            sa.update_nrr()
+            sb.update_nrr()
+
+        self._standings_cache = None
+        self._invalidate_payload()
         self.current_group_match_idx += 1
 
         # Check if group stage is complete
@@ -141,12 +157,38 @@ class Tournament:
 
     def get_sorted_standings(self) -> List[dict]:
         """Return standings sorted by points (desc), then NRR (desc)."""
-        entries = sorted(
-            self.standings.values(),
-            key=lambda e: (e.points, e.nrr),
-            reverse=True,
-        )
-        return [e.to_dict() for e in entries]
+        if self._standings_cache is None:
+            entries = sorted(
+                self.standings.values(),
+                key=attrgetter("points", "nrr"),
+                reverse=True,
+            )
+            self._standings_cache = [e.to_dict() for e in entries]
+        return self._standings_cache
+
+    def payload(self, skip_current: bool) -> dict:
+        """Standings, phase and upcoming fixtures for clients, cached until the next result."""
+        cached = self._payload_cache.get(skip_current)
+        if cached is not None:
+            return cached
+        upcoming = []
+        if self.phase == self.PHASE_GROUP:
+            start = self.current_group_match_idx + (1 if skip_current else 0)
+            upcoming = [{"label": "group", "teams": [a, b]} for a, b in self.group_matches[start:]]
+        else:
+            for key in (self.PHASE_Q1, self.PHASE_ELIM, self.PHASE_Q2, self.PHASE_FINAL):
+                pair = self.playoff_matches.get(key)
+                upcoming.append({"label": key, "teams": list(pair) if pair else []})
+        payload = self._payload_cache[skip_current] = {
+            "standings": self.get_sorted_standings(),
+            "phase": self.phase,
+            "info": self.to_dict(),
+            "upcoming_matches": upcoming,
+        }
+        return payload
+
+    def _invalidate_payload(self) -> None:
+        self._payload_cache.clear()
 
     def _setup_playoffs(self) -> None:
         """Transition to playoff stage after group matches are done."""
@@ -163,20 +205,22 @@ class Tournament:
         return None
 
     def _build_round_robin_rounds(self, players: List[str]) -> List[List[tuple]]:
+        """Circle method: pool[0] stays fixed, the rest rotate one step per round."""
         pool = list(players)
         if len(pool) % 2 == 1:
             pool.append(None)
         n = len(pool)
+        fixed, rest = pool[0], pool[1:]
+        m = n - 1
         rounds: List[List[tuple]] = []
-        for _ in range(n - 1):
+        for r in range(m):
             pairs: List[tuple] = []
             for i in range(n // 2):
-                a = pool[i]
-                b = pool[n - 1 - i]
+                a = fixed if i == 0 else rest[(i - 1 - r) % m]
+                b = rest[(n - 2 - i - r) % m]
                 if a is not None and b is not None:
                     pairs.append((a, b))
             rounds.append(pairs)
-            pool = [pool[0]] + [pool[-1]] + pool[1:-1]
         return rounds
 
     def _flatten_rounds(self, rounds: List[List[tuple]]) -> List[tuple]:
@@ -193,6 +237,7 @@ class Tournament:
 
     def record_playoff_result(self, winner: str, loser: str) -> None:
         """Record playoff result and advance bracket."""
+        self._invalidate_payload()
         self.playoff_results[self.phase] = winner
 
         if self.phase == self.PHASE_Q1:
@@ -48,5 +48,6 @@ app.include_router(stats_router)
 app.include_router(ws_router)
 
 if __name__ == "__main__":
-    # No --reload to prevent match interruption
-    uvicorn.run("backend.main:app", host=HOST, port=PORT, reload=False)
+    # No --reload to prevent match interruption.
+    # loop="auto" runs on uvloop where it is installed and falls back to asyncio (e.g. on Windows).
+    uvicorn.run("backend.main:app", host=HOST, port=PORT, reload=False, loop="auto")
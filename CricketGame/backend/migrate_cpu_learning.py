@@ -13,8 +13,6 @@ def migrate_cpu_learning_tables():
     print("🔧 Starting CPU Learning Infrastructure Migration...")
     
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
     
     # Tables to create
     learning_tables = [
@@ -31,9 +29,9 @@ def migrate_cpu_learning_tables():
     print("\n📊 Creating CPU Learning Tables...")
     LearningBase.metadata.create_all(bind=engine)
     
-    # Verify creation
-    inspector = inspect(engine)
-    new_tables = inspector.get_table_names()
+    # Verify creation (single metadata query; index details come from the models)
+    new_tables = set(inspect(engine).get_table_names())
+    schema_tables = LearningBase.metadata.tables
     
     print("\n✅ Migration Complete!")
     print("\nCreated Tables:")
@@ -42,12 +40,12 @@ def migrate_cpu_learning_tables():
             print(f"  ✓ {table}")
             
             # Show indices for this table
-            indices = inspector.get_indexes(table)
+            indices = schema_tables[table].indexes if table in schema_tables else ()
             if indices:
                 print(f"    Indices: {len(indices)}")
                 for idx in indices:
-                    cols = ', '.join(idx['column_names'])
-                    print(f"      - {idx['name']}: ({cols})")
+                    cols = ', '.join(col.name for col in idx.columns)
+                    print(f"      - {idx.name}: ({cols})")
         else:
             print(f"  ✗ {table} - FAILED")
     
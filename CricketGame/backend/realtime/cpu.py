@@ -1,119 +1,175 @@
 import asyncio
-import random
+import heapq
 
-from ..data.database import SessionLocal
+from ..data.database import session_scope
 from ..cpu.cpu_learning_utils import get_user_id_from_username
+from .match.match_actions import _side_captains, start_ball_countdowns
+from .match.match_state import send_match_state_soon
 
+# Fallback picker: base weight per move 0-6
+_MOVES = tuple(range(7))
+_BASE_WEIGHTS = (0.08, 0.16, 0.16, 0.15, 0.16, 0.14, 0.15)
 
-def cpu_pick_move(manager, room, role: str, cpu_name: str) -> int:
-    match = room.match
-    if not match:
-        return random.randint(0, 6)
+_COIN_CALLS = ("heads", "tails")
 
-    innings = match.active_innings
-    if not innings:
-        return random.randint(0, 6)
+# Pause before each CPU ball so connected players can follow along
+CPU_AUTOPLAY_DELAY = 0.25
+# Unpaced autoplay hands control back to the loop once per this many balls
+_UNPACED_YIELD_BALLS = 6
 
-    if role == "bat":
-        opponent_username = innings.current_bowler if innings.current_bowler != cpu_name else None
-        opponent_role_history = "bowl"
-    else:
-        opponent_username = innings.striker if innings.striker != cpu_name else None
-        opponent_role_history = "bat"
-
-    if not opponent_username:
-        return cpu_pick_move_simple(manager, room, role, cpu_name)
-
-    db = SessionLocal()
-    try:
-        opponent_user_id = get_user_id_from_username(opponent_username, db)
-    finally:
-        db.close()
-
-    if opponent_user_id == -1:
-        return cpu_pick_move_simple(manager, room, role, cpu_name)
 
+def set_cpu_autoplay_delay(room) -> None:
+    """Drop autoplay pacing for an all-CPU match that nobody is connected to watch."""
+    match = room.match
+    unwatched = match is not None and not room.players and all(
+        p in room.cpu_name_set for p in match.side_a + match.side_b
+    )
+    room.cpu_autoplay_delay = 0.0 if unwatched else CPU_AUTOPLAY_DELAY
+
+
+def _cpu_match_context(room, match, innings, role: str) -> dict:
+    """A fresh strategy-engine context for one pick, built on the event loop."""
+    # Fields fixed for the innings are built once; each pick gets its own copy
+    cached = room.cpu_context
+    if cached is not None and cached[0] is innings:
+        base = cached[1]
+    else:
+        base = {
+            "match_format": f"{match.total_overs}over",
+            "total_overs": innings.total_overs,
+            "target": innings.target,
+            "batting_first": match.current_innings == 1,
+        }
+        room.cpu_context = (innings, base)
     balls_bowled = innings.overs_completed * 6 + innings.balls_in_over
-    total_balls = innings.total_overs * 6
-    balls_remaining = total_balls - balls_bowled
-
-    last_3_results = []
-    if len(innings.ball_log) >= 3:
-        for ball_result in innings.ball_log[-3:]:
-            last_3_results.append({
-                "runs": ball_result.get("runs", 0),
-                "is_out": ball_result.get("is_out", False)
-            })
-
-    match_context = {
-        "match_format": f"{match.total_overs}over",
+    recent = innings.recent_results
+    return {
+        **base,
         "role": "batting" if role == "bat" else "bowling",
         "current_over": innings.overs_completed,
-        "total_overs": innings.total_overs,
         "current_score": innings.total_runs,
-        "target": innings.target,
         "wickets_lost": innings.wickets_fallen,
-        "balls_left": balls_remaining,
-        "batting_first": match.current_innings == 1,
-        "last_3_results": last_3_results,
+        "balls_left": innings.total_balls - balls_bowled,
+        "last_3_results": list(recent) if len(recent) == 3 else [],
     }
 
-    opponent_history = []
-    for ball_result in innings.ball_log[-20:]:
-        if opponent_role_history == "bat":
-            move = ball_result.get("bat_move")
-        else:
-            move = ball_result.get("bowl_move")
-
-        if move is not None:
-            opponent_history.append(move)
 
+def _strategy_move(engine, opponent_username: str, opponent_user_id, match_context: dict,
+                   opponent_history: list) -> tuple:
+    """
+    Worker-thread half of a CPU pick: user lookup and strategy engine only.
+    Works on the snapshots it is given; returns (opponent_user_id, move or None).
+    """
+    if opponent_user_id is None:
+        with session_scope() as db:
+            opponent_user_id = get_user_id_from_username(opponent_username, db)
+    if opponent_user_id == -1:
+        return opponent_user_id, None
     try:
-        cpu_move = manager.cpu_engine.select_move(
+        cpu_move = engine.select_move(
             user_id=opponent_user_id,
             match_context=match_context,
             opponent_history=opponent_history,
         )
-        return cpu_move
+        return opponent_user_id, cpu_move
     except Exception as e:
         print(f"⚠ Error in CPU strategy engine: {e}")
+        return opponent_user_id, None
+
+
+async def cpu_pick_move(manager, room, role: str, cpu_name: str) -> int:
+    match = room.match
+    if not match:
+        return room.rng.randint(0, 6)
+
+    innings = match.active_innings
+    if not innings:
+        return room.rng.randint(0, 6)
+
+    if role == "bat":
+        opponent = innings.current_bowler
+        opponent_role = "bowl"
+    else:
+        opponent = innings.striker
+        opponent_role = "bat"
+    opponent_username = opponent if opponent != cpu_name else None
+
+    if not opponent_username:
+        return cpu_pick_move_simple(manager, room, role, cpu_name)
+
+    opponent_user_id = room.user_ids.get(opponent_username)
+    if opponent_user_id == -1:
         return cpu_pick_move_simple(manager, room, role, cpu_name)
 
+    # Room and innings state is read here on the loop; the thread only sees copies
+    match_context = _cpu_match_context(room, match, innings, role)
+    opponent_history = innings.recent_moves(opponent_role)
+
+    # Run in thread to prevent blocking event loop with DB queries
+    opponent_user_id, cpu_move = await asyncio.to_thread(
+        _strategy_move, manager.cpu_engine, opponent_username, opponent_user_id,
+        match_context, opponent_history,
+    )
+    room.user_ids[opponent_username] = opponent_user_id
+    if cpu_move is None:
+        return cpu_pick_move_simple(manager, room, role, cpu_name)
+    return cpu_move
+
 
 def cpu_pick_move_simple(manager, room, role: str, cpu_name: str) -> int:
-    weights = {0: 0.08, 1: 0.16, 2: 0.16, 3: 0.15, 4: 0.16, 5: 0.14, 6: 0.15}
+    weights = list(_BASE_WEIGHTS)
     history_key = "bat" if role == "bowl" else "bowl"
-    recent = room.cpu_history.get(cpu_name, {}).get(history_key, [])[-12:]
+    # A bounded window of the opponent's recent moves (see CPU_HISTORY_WINDOW)
+    recent = room.cpu_history.get(cpu_name, {}).get(history_key, ())
     if recent:
-        counts = {n: 0 for n in range(0, 7)}
+        counts = [0] * 7
         for m in recent:
-            counts[m] = counts.get(m, 0) + 1
-        top = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:2]
+            counts[m] += 1
+        top = heapq.nlargest(2, enumerate(counts), key=lambda kv: kv[1])
         if role == "bowl":
             for num, count in top:
                 if count > 0:
-                    weights[num] = weights.get(num, 0) + 0.18
+                    weights[num] += 0.18
         else:
             for num, count in top:
                 if count > 0:
-                    weights[num] = weights.get(num, 0) * 0.6
-    return manager._weighted_choice(weights)
+                    weights[num] *= 0.6
+    return room.rng.choices(_MOVES, weights=weights)[0]
+
+
+async def _place_cpu_move(manager, room, innings, role: str, cpu_name: str) -> bool:
+    """
+    Pick a CPU move and store it in room.pending_moves.
+    The pick is dropped if the ball it was made for was resolved meanwhile.
+    """
+    ball = len(innings.ball_log)
+    move = await cpu_pick_move(manager, room, role, cpu_name)
+    match = room.match
+    if not match or match.active_innings is not innings or len(innings.ball_log) != ball:
+        return False
+    if role in room.pending_moves:
+        return False
+    room.pending_moves[role] = move
+    return True
 
 
-async def maybe_cpu_move(manager, room, innings) -> None:
+async def maybe_cpu_move(manager, room, innings) -> bool:
     """
     Submit CPU moves independently of the human side.
     Skips if captain selection is pending — the captain pick flow handles
     resuming play after the choice is made.
+    Returns True when a move was placed; a coalesced MATCH_STATE send is then
+    scheduled (send_match_state_soon), not yet delivered. Any immediate
+    send_match_state supersedes it with the newer state.
     """
     if not room.cpu_enabled:
-        return
+        return False
 
     # Do NOT submit CPU ball moves while waiting for a captain to pick
     if innings.needs_batter_choice or innings.needs_bowler_choice:
         # If the relevant captain is a CPU, auto-pick immediately
         await _handle_cpu_captain_picks(manager, room, innings)
-        return
+        return False
 
     pending = room.pending_moves
     striker_is_cpu = manager._is_cpu(room, innings.striker)
@@ -123,59 +179,50 @@ async def maybe_cpu_move(manager, room, innings) -> None:
 
     # CPU batter: submit immediately if its slot is empty
     if striker_is_cpu and "bat" not in pending:
-        await asyncio.sleep(0.25)
-        # Run in thread to prevent blocking event loop with DB queries
-        pending["bat"] = await asyncio.to_thread(cpu_pick_move, manager, room, "bat", innings.striker)
-        placed = True
+        await asyncio.sleep(room.cpu_autoplay_delay)
+        placed = await _place_cpu_move(manager, room, innings, "bat", innings.striker)
 
     # CPU bowler: submit immediately if its slot is empty
     if bowler_is_cpu and "bowl" not in pending:
         if not placed:
-            await asyncio.sleep(0.25)
-        # Run in thread to prevent blocking event loop with DB queries
-        pending["bowl"] = await asyncio.to_thread(cpu_pick_move, manager, room, "bowl", innings.current_bowler)
-        placed = True
+            await asyncio.sleep(room.cpu_autoplay_delay)
+        placed = await _place_cpu_move(manager, room, innings, "bowl", innings.current_bowler) or placed
 
-    # Broadcast state so the frontend immediately sees the CPU's ready indicator
+    # Show the CPU's ready indicator; folded into the ball result if that follows at once
     if placed:
-        await manager._send_match_state(room)
+        send_match_state_soon(manager, room)
         # If both sides are CPU for this ball, immediately kick resolver loop.
         if manager._is_cpu(room, innings.striker) and manager._is_cpu(room, innings.current_bowler):
             await manager._auto_play_cpu_match(room)
+    return placed
 
 
 async def _handle_cpu_captain_picks(manager, room, innings) -> bool:
     """Auto-pick captain choices when the relevant captain is a CPU."""
-    from .match.match_actions import _team_for_side
-
     if innings.needs_batter_choice:
-        batting_team = _team_for_side(room, innings.batting_side)
-        captain = room.captains.get(batting_team) if batting_team else None
+        captain = _side_captains(room, innings)[0]
         if captain and manager._is_cpu(room, captain):
-            options = innings.available_next_batters()
-            enabled = [o for o in options if not o["disabled"]]
-            choice = (enabled or options)
-            if choice:
+            choice = innings.batter_pick_options().first_choice
+            if choice is not None:
                 await asyncio.sleep(0.3)
-                innings.apply_batter_choice(choice[0]["player"])
-                await manager._send_match_state(room)
-                await manager._maybe_cpu_move(room, innings)
+                innings.apply_batter_choice(choice)
+                # A placed CPU move schedules a state send that includes this pick
+                if not await manager._maybe_cpu_move(room, innings):
+                    await manager._send_match_state(room)
                 await manager._auto_play_cpu_match(room)
                 return True
             return True
 
     if innings.needs_bowler_choice:
-        bowling_team = _team_for_side(room, innings.bowling_side)
-        captain = room.captains.get(bowling_team) if bowling_team else None
+        captain = _side_captains(room, innings)[1]
         if captain and manager._is_cpu(room, captain):
-            options = innings.available_next_bowlers()
-            enabled = [o for o in options if not o["disabled"]]
-            choice = (enabled or options)
-            if choice:
+            choice = innings.bowler_pick_options().first_choice
+            if choice is not None:
                 await asyncio.sleep(0.3)
-                innings.apply_bowler_choice(choice[0]["player"])
-                await manager._send_match_state(room)
-                await manager._maybe_cpu_move(room, innings)
+                innings.apply_bowler_choice(choice)
+                # A placed CPU move schedules a state send that includes this pick
+                if not await manager._maybe_cpu_move(room, innings):
+                    await manager._send_match_state(room)
                 await manager._auto_play_cpu_match(room)
                 return True
             return True
@@ -187,7 +234,7 @@ async def cpu_call_toss(manager, room) -> None:
     match = room.match
     if not match:
         return
-    call = random.choice(["heads", "tails"])
+    call = _COIN_CALLS[room.rng.getrandbits(1)]
     result = match.resolve_toss(call)
     room.toss_state["phase"] = "choosing"
     await manager.broadcast(room, {
@@ -210,7 +257,7 @@ async def cpu_choose_toss(manager, room) -> None:
     match = room.match
     if not match:
         return
-    choice = "bat" if random.random() < 0.6 else "bowl"
+    choice = "bat" if room.rng.random() < 0.6 else "bowl"
     match.apply_toss_choice(choice)
     await manager.broadcast(room, {
         "type": "TOSS_DECISION",
@@ -224,7 +271,6 @@ async def cpu_choose_toss(manager, room) -> None:
     await asyncio.sleep(2)
     await manager._send_match_state(room)
     # Start ball-pick countdowns for the first ball
-    from .match.match_actions import start_ball_countdowns
     if match.active_innings:
         start_ball_countdowns(manager, room, match.active_innings)
     await manager._auto_play_cpu_match(room)
@@ -234,6 +280,7 @@ async def auto_play_cpu_match(manager, room) -> None:
     if room.cpu_autoplay:
         return
     room.cpu_autoplay = True
+    balls = 0
     try:
         while True:
             match = room.match
@@ -242,6 +289,9 @@ async def auto_play_cpu_match(manager, room) -> None:
             innings = match.active_innings
             if not innings:
                 return
+            # Resumed by the innings-break task once the pause is over
+            if "innings_break" in room.pending_timeouts:
+                return
 
             # Pause auto-play during captain selection
             if innings.needs_batter_choice or innings.needs_bowler_choice:
@@ -255,15 +305,21 @@ async def auto_play_cpu_match(manager, room) -> None:
                 return
             pending = room.pending_moves
             if "bat" not in pending:
-                # Run in thread to prevent blocking event loop with DB queries
-                pending["bat"] = await asyncio.to_thread(cpu_pick_move, manager, room, "bat", innings.striker)
+                await _place_cpu_move(manager, room, innings, "bat", innings.striker)
             if "bowl" not in pending:
-                # Run in thread to prevent blocking event loop with DB queries
-                pending["bowl"] = await asyncio.to_thread(cpu_pick_move, manager, room, "bowl", innings.current_bowler)
-            await asyncio.sleep(0.25)
+                await _place_cpu_move(manager, room, innings, "bowl", innings.current_bowler)
+            if "bat" not in room.pending_moves or "bowl" not in room.pending_moves:
+                continue  # the ball moved on while picking; re-read the match
+            # Unwatched all-CPU matches run ball to ball without pacing. Move
+            # picks may finish without awaiting anything (a cached non-user
+            # opponent skips the worker thread), so yield explicitly every over
+            balls += 1
+            if room.cpu_autoplay_delay:
+                await asyncio.sleep(room.cpu_autoplay_delay)
+            elif balls % _UNPACED_YIELD_BALLS == 0:
+                await asyncio.sleep(0)
             resolved = await manager._resolve_pending_ball(room, innings)
             if not resolved:
                 return
-            await asyncio.sleep(0)
     finally:
         room.cpu_autoplay = False
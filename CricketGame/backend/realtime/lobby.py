@@ -1,3 +1,24 @@
+import asyncio
+
+from .models import new_cpu_history
+
+# Rapid host edits (e.g. dragging the overs slider) coalesce into one update
+LOBBY_BROADCAST_DELAY = 0.05
+
+
+def _broadcast_lobby_soon(manager, room) -> None:
+    """Schedule a single lobby broadcast for the room unless one is already pending."""
+    task = room._lobby_broadcast_task
+    if task is not None and not task.done():
+        return
+    room._lobby_broadcast_task = asyncio.create_task(_delayed_broadcast_lobby(manager, room))
+
+
+async def _delayed_broadcast_lobby(manager, room) -> None:
+    await asyncio.sleep(LOBBY_BROADCAST_DELAY)
+    await manager.broadcast_lobby(room)
+
+
 async def configure(manager, room, player, msg: dict) -> None:
     if player.username != room.host:
         return
@@ -10,16 +31,14 @@ async def configure(manager, room, player, msg: dict) -> None:
     room.host_plays = bool(msg.get("host_plays", room.host_plays))
     if not room.host_plays:
         print(f"🛑 Host opt-out: host={room.host} room={room.code} mode={room.mode}")
-        for t in room.teams.values():
-            if room.host in t:
-                t.remove(room.host)
+        room.set_player_team(room.host, None)
         for team_key, captain in list(room.captains.items()):
             if captain == room.host:
                 room.captains[team_key] = None
         if room.host in room.players:
             room.players[room.host].team = None
             room.players[room.host].is_captain = False
-    await manager.broadcast_lobby(room)
+    _broadcast_lobby_soon(manager, room)
 
 
 async def assign_team(manager, room, player, msg: dict) -> None:
@@ -31,13 +50,10 @@ async def assign_team(manager, room, player, msg: dict) -> None:
         return
     if target == room.host and not room.host_plays:
         return
-    for t in room.teams.values():
-        if target in t:
-            t.remove(target)
-    room.teams[team].append(target)
+    room.set_player_team(target, team)
     if target in room.players:
         room.players[target].team = team
-    await manager.broadcast_lobby(room)
+    _broadcast_lobby_soon(manager, room)
 
 
 async def set_team_name(manager, room, player, msg: dict) -> None:
@@ -45,7 +61,7 @@ async def set_team_name(manager, room, player, msg: dict) -> None:
     name = msg.get("name", "")
     if player.username == room.captains.get(team) or player.username == room.host:
         room.team_names[team] = name
-        await manager.broadcast_lobby(room)
+        _broadcast_lobby_soon(manager, room)
 
 
 async def set_captain(manager, room, player, msg: dict) -> None:
@@ -57,11 +73,8 @@ async def set_captain(manager, room, player, msg: dict) -> None:
         return
     if captain == room.host and not room.host_plays:
         return
-    if captain not in room.teams.get(team, []):
-        for t in room.teams.values():
-            if captain in t:
-                t.remove(captain)
-        room.teams[team].append(captain)
+    if room.player_team.get(captain) != team:
+        room.set_player_team(captain, team)
         if captain in room.players:
             room.players[captain].team = team
     old_captain = room.captains.get(team)
@@ -70,18 +83,18 @@ async def set_captain(manager, room, player, msg: dict) -> None:
     room.captains[team] = captain
     if captain in room.players:
         room.players[captain].is_captain = True
-    await manager.broadcast_lobby(room)
+    _broadcast_lobby_soon(manager, room)
 
 
 async def reset_teams(manager, room, player) -> None:
     if player.username != room.host:
         return
-    room.teams = {"A": [], "B": []}
+    room.clear_teams()
     room.captains = {"A": None, "B": None}
     for p in room.players.values():
         p.team = None
         p.is_captain = False
-    await manager.broadcast_lobby(room)
+    _broadcast_lobby_soon(manager, room)
 
 
 async def add_cpu(manager, room, player) -> None:
@@ -94,9 +107,9 @@ async def add_cpu(manager, room, player) -> None:
     room.cpu_enabled = True
     room.cpu_only = False
     cpu_name = manager._next_cpu_name(room)
-    room.cpu_names.append(cpu_name)
-    room.cpu_history[cpu_name] = {"bat": [], "bowl": []}
-    await manager.broadcast_lobby(room)
+    room.add_cpu_name(cpu_name)
+    room.cpu_history[cpu_name] = new_cpu_history()
+    _broadcast_lobby_soon(manager, room)
 
 
 async def remove_cpu(manager, room, player) -> None:
@@ -108,14 +121,12 @@ async def remove_cpu(manager, room, player) -> None:
         return
     if not room.cpu_names:
         return
-    cpu_name = room.cpu_names.pop()
-    for t in room.teams.values():
-        if cpu_name in t:
-            t.remove(cpu_name)
+    cpu_name = room.pop_cpu_name()
+    room.set_player_team(cpu_name, None)
     for team_key, captain in list(room.captains.items()):
         if captain == cpu_name:
             room.captains[team_key] = None
     room.cpu_history.pop(cpu_name, None)
     if not room.cpu_names:
         room.cpu_enabled = False
-    await manager.broadcast_lobby(room)
+    _broadcast_lobby_soon(manager, room)
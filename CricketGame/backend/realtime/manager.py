@@ -1,37 +1,70 @@
-import random
+import asyncio
 from typing import Dict, Optional, List
+
+import orjson
+
 from ..cpu.cpu_strategy_engine import CPUStrategyEngine
-from .models import Room, PlayerConn, gen_room_code
+from .models import Room, PlayerConn, gen_room_code, new_cpu_history
 from . import cpu as cpu_logic
 from . import lobby as lobby_actions
 from . import match as match_flow
 from . import tournament as tournament_flow
 
 
+# Longest a broadcast waits on its slowest recipient before moving on
+BROADCAST_SEND_TIMEOUT = 0.5
+
+
+def _encode(msg: dict) -> str:
+    """Serialize an outgoing message to compact JSON text."""
+    return orjson.dumps(msg, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class RoomManager:
     def __init__(self):
         self.rooms: Dict[str, Room] = {}
         self.cpu_engine = CPUStrategyEngine()
-    def create_room(self, host: str) -> str:
+        # Broadcast sends still in flight after BROADCAST_SEND_TIMEOUT
+        self._slow_sends: set = set()
+        # Client action -> handler(room, player, msg)
+        self._dispatch = {
+            "CONFIGURE": self._configure,
+            "START_MATCH": lambda room, player, msg: self._start_match(room, player),
+            "START_TOURNAMENT": lambda room, player, msg: self._start_tournament(room, player),
+            "TOSS_CALL": self._toss_call,
+            "TOSS_CHOICE": self._toss_choice,
+            "GAME_MOVE": self._game_move,
+            "ASSIGN_TEAM": self._assign_team,
+            "SET_TEAM_NAME": self._set_team_name,
+            "SET_CAPTAIN": self._set_captain,
+            "RESET_TEAMS": lambda room, player, msg: self._reset_teams(room, player),
+            "ADD_CPU": lambda room, player, msg: self._add_cpu(room, player),
+            "REMOVE_CPU": lambda room, player, msg: self._remove_cpu(room, player),
+            "CANCEL_MATCH": lambda room, player, msg: self._cancel_match(room, player),
+            "PICK_BATTER": self._pick_batter,
+            "PICK_BOWLER": self._pick_bowler,
+        }
+    def _allocate_code(self) -> str:
         code = gen_room_code()
         while code in self.rooms:
             code = gen_room_code()
+        return code
+    def create_room(self, host: str) -> str:
+        code = self._allocate_code()
         self.rooms[code] = Room(code, host)
         return code
     def create_cpu_room(self, host: str) -> str:
-        code = gen_room_code()
-        while code in self.rooms:
-            code = gen_room_code()
+        code = self._allocate_code()
         room = Room(code, host)
         room.cpu_enabled = True
         room.cpu_only = True
         cpu_name = self._next_cpu_name(room)
-        room.cpu_names.append(cpu_name)
-        room.cpu_history[cpu_name] = {"bat": [], "bowl": []}
+        room.add_cpu_name(cpu_name)
+        room.cpu_history[cpu_name] = new_cpu_history()
         self.rooms[code] = room
         return code
     def _next_cpu_name(self, room: Room) -> str:
-        taken = set(room.players.keys()) | set(room.cpu_names)
+        taken = room.players.keys() | room.cpu_name_set
         if room.host != "CPU" and "CPU" not in taken:
             return "CPU"
         base = "CPU Bot"
@@ -44,85 +77,85 @@ class RoomManager:
     def get_room(self, code: str) -> Optional[Room]:
         return self.rooms.get(code)
     def delete_room(self, code: str) -> None:
-        self.rooms.pop(code, None)
+        room = self.rooms.pop(code, None)
+        if room:
+            match_flow.flush_ball_log(room)
     async def send(self, player: PlayerConn, msg: dict) -> None:
-        try:
-            await player.ws.send_json(msg)
-        except Exception:
-            pass
+        # State snapshots are superseded by the next one, so a backed-up client can skip them
+        await self._send_text(player, _encode(msg), droppable=msg.get("type") == "MATCH_STATE")
+    def encode(self, msg: dict) -> str:
+        return _encode(msg)
+    async def send_encoded(self, player: PlayerConn, text: str, droppable: bool = False) -> None:
+        """Send a message already serialized with encode()."""
+        await self._send_text(player, text, droppable=droppable)
     async def broadcast(self, room: Room, msg: dict, exclude: Optional[str] = None) -> None:
-        for username, p in room.players.items():
-            if username != exclude:
-                await self.send(p, msg)
+        if not room.players:
+            return
+        # Encode once and fan the same text out to every recipient
+        text = _encode(msg)
+        recipients = [p for username, p in room.players.items() if username != exclude]
+        if len(recipients) == 1:
+            await self._send_text(recipients[0], text)
+            return
+        if not recipients:
+            return
+        tasks = [asyncio.create_task(self._send_text(p, text)) for p in recipients]
+        _, pending = await asyncio.wait(tasks, timeout=BROADCAST_SEND_TIMEOUT)
+        # Let slow clients finish in the background instead of holding up the room
+        for task in pending:
+            self._slow_sends.add(task)
+            task.add_done_callback(self._slow_sends.discard)
+    async def _send_text(self, player: PlayerConn, text: str, droppable: bool = False) -> None:
+        if player.closed:
+            return
+        if droppable:
+            if player.pending_bytes > player.high_water:
+                # Keep only the newest state; it goes out once the backlog drains
+                player.deferred_state = text
+                return
+            # This state supersedes any older one still held back
+            player.deferred_state = None
+        size = len(text)
+        player.pending_bytes += size
+        try:
+            await player.ws.send_text(text)
+        except Exception as e:
+            # Stop writing to a dead socket; later sends skip it until it is cleaned up
+            player.closed = True
+            print(f"[WS] Send to {player.username} failed: {e}")
+        finally:
+            player.pending_bytes -= size
+        deferred = player.deferred_state
+        if deferred is not None and player.pending_bytes <= player.high_water:
+            player.deferred_state = None
+            await self._send_text(player, deferred, droppable=True)
     async def broadcast_lobby(self, room: Room) -> None:
-        await self.broadcast(room, {
-            "type": "LOBBY_UPDATE",
-            "players": room.player_list,
-            "host": room.host,
-            "mode": room.mode,
-            "overs": room.overs,
-            "wickets": room.wickets,
-            "teams": room.teams,
-            "team_names": room.team_names,
-            "captains": room.captains,
-            "room_code": room.code,
-            "cpu_enabled": room.cpu_enabled,
-            "cpu_only": room.cpu_only,
-            "cpu_count": len(room.cpu_names),
-            "host_plays": room.host_plays,
-        })
+        if not room.players:
+            return
+        payload = room._lobby_payload
+        # Fixed fields are set once per room; the rest are refreshed in place
+        payload["players"] = room.player_list
+        payload["mode"] = room.mode
+        payload["overs"] = room.overs
+        payload["wickets"] = room.wickets
+        payload["teams"] = room.teams
+        payload["team_names"] = room.team_names
+        payload["captains"] = room.captains
+        payload["cpu_enabled"] = room.cpu_enabled
+        payload["cpu_only"] = room.cpu_only
+        payload["cpu_count"] = len(room.cpu_names)
+        payload["host_plays"] = room.host_plays
+        await self.broadcast(room, payload)
     def _is_cpu(self, room: Room, username: str) -> bool:
-        return room.cpu_enabled and username in room.cpu_names
+        return room.cpu_enabled and username in room.cpu_name_set
     def _team_for_player(self, room: Room, username: str) -> Optional[str]:
-        for team_key, members in room.teams.items():
-            if username in members:
-                return team_key
-        return None
+        return room.player_team.get(username)
     def _active_humans(self, room: Room) -> List[str]:
         return [p.username for p in room.players.values() if room.host_plays or p.username != room.host]
-    def _weighted_choice(self, weights: Dict[int, float]) -> int:
-        total = sum(weights.values())
-        if total <= 0:
-            return 0
-        roll = random.random() * total
-        upto = 0.0
-        for move, weight in weights.items():
-            upto += weight
-            if roll <= upto:
-                return move
-        return 0
     async def handle_message(self, room: Room, player: PlayerConn, msg: dict) -> None:
-        action = msg.get("action", "")
-        if action == "CONFIGURE":
-            await self._configure(room, player, msg)
-        elif action == "START_MATCH":
-            await self._start_match(room, player)
-        elif action == "START_TOURNAMENT":
-            await self._start_tournament(room, player)
-        elif action == "TOSS_CALL":
-            await self._toss_call(room, player, msg)
-        elif action == "TOSS_CHOICE":
-            await self._toss_choice(room, player, msg)
-        elif action == "GAME_MOVE":
-            await self._game_move(room, player, msg)
-        elif action == "ASSIGN_TEAM":
-            await self._assign_team(room, player, msg)
-        elif action == "SET_TEAM_NAME":
-            await self._set_team_name(room, player, msg)
-        elif action == "SET_CAPTAIN":
-            await self._set_captain(room, player, msg)
-        elif action == "RESET_TEAMS":
-            await self._reset_teams(room, player)
-        elif action == "ADD_CPU":
-            await self._add_cpu(room, player)
-        elif action == "REMOVE_CPU":
-            await self._remove_cpu(room, player)
-        elif action == "CANCEL_MATCH":
-            await self._cancel_match(room, player)
-        elif action == "PICK_BATTER":
-            await self._pick_batter(room, player, msg)
-        elif action == "PICK_BOWLER":
-            await self._pick_bowler(room, player, msg)
+        handler = self._dispatch.get(msg.get("action", ""))
+        if handler:
+            await handler(room, player, msg)
     async def _configure(self, room: Room, player: PlayerConn, msg: dict) -> None:
         await lobby_actions.configure(self, room, player, msg)
     async def _assign_team(self, room: Room, player: PlayerConn, msg: dict) -> None:
@@ -147,8 +180,9 @@ class RoomManager:
         await match_flow.toss_choice(self, room, player, msg)
     async def _game_move(self, room: Room, player: PlayerConn, msg: dict) -> None:
         await match_flow.game_move(self, room, player, msg)
-    async def _send_match_state(self, room: Room) -> None:
-        await match_flow.send_match_state(self, room)
+    async def _send_match_state(self, room: Room, batch_with: Optional[List[dict]] = None,
+                                follow_up: Optional[Dict[str, dict]] = None) -> None:
+        await match_flow.send_match_state(self, room, batch_with, follow_up)
     async def _resolve_pending_ball(self, room: Room, innings) -> bool:
         return await match_flow.resolve_pending_ball(self, room, innings)
     def _save_match_stats(self, room: Room, match) -> None:
@@ -165,8 +199,8 @@ class RoomManager:
         await cpu_logic.cpu_call_toss(self, room)
     async def _cpu_choose_toss(self, room: Room) -> None:
         await cpu_logic.cpu_choose_toss(self, room)
-    async def _maybe_cpu_move(self, room: Room, innings) -> None:
-        await cpu_logic.maybe_cpu_move(self, room, innings)
+    async def _maybe_cpu_move(self, room: Room, innings) -> bool:
+        return await cpu_logic.maybe_cpu_move(self, room, innings)
     async def _auto_play_cpu_match(self, room: Room) -> None:
         await cpu_logic.auto_play_cpu_match(self, room)
     async def _start_tournament(self, room: Room, player: PlayerConn) -> None:
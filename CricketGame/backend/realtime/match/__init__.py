@@ -1,9 +1,9 @@
 from .match_start import start_match
 from .toss import initiate_toss, toss_call, toss_choice
-from .match_logging import record_cpu_history, log_ball_for_learning
+from .match_logging import record_cpu_history, log_ball_for_learning, flush_ball_log
 from .match_actions import resolve_pending_ball, game_move, cancel_match, handle_pick_batter, handle_pick_bowler
-from .match_state import send_match_state
-from .match_persistence import save_match_stats, save_match_history
+from .match_state import send_match_state, send_match_state_soon
+from .match_persistence import save_match_stats, save_match_history, save_match_records
 
 __all__ = [
     "start_match",
@@ -12,11 +12,14 @@ __all__ = [
     "toss_choice",
     "record_cpu_history",
     "log_ball_for_learning",
+    "flush_ball_log",
     "resolve_pending_ball",
     "game_move",
     "send_match_state",
+    "send_match_state_soon",
     "save_match_stats",
     "save_match_history",
+    "save_match_records",
     "cancel_match",
     "handle_pick_batter",
     "handle_pick_bowler",
@@ -2,15 +2,15 @@
 # Re-exports so existing code can still do:
 #   from .match_actions import game_move, cancel_match, ...
 from .ball import resolve_pending_ball, game_move, cancel_match, start_ball_countdowns
-from .captain import handle_pick_batter, handle_pick_bowler, _team_for_side
+from .captain import handle_pick_batter, handle_pick_bowler, _team_for_side, _side_captains
 from .timeouts import (
-    BALL_PICK_TIMEOUT, CAPTAIN_PICK_TIMEOUT, MAX_AUTO_STRIKES,
+    BALL_PICK_TIMEOUT, CAPTAIN_PICK_TIMEOUT, MAX_AUTO_STRIKES, INNINGS_BREAK_PAUSE,
     _cancel_timeout, _start_timeout,
 )
 
 __all__ = [
     "resolve_pending_ball", "game_move", "cancel_match", "start_ball_countdowns",
-    "handle_pick_batter", "handle_pick_bowler", "_team_for_side",
-    "BALL_PICK_TIMEOUT", "CAPTAIN_PICK_TIMEOUT", "MAX_AUTO_STRIKES",
+    "handle_pick_batter", "handle_pick_bowler", "_team_for_side", "_side_captains",
+    "BALL_PICK_TIMEOUT", "CAPTAIN_PICK_TIMEOUT", "MAX_AUTO_STRIKES", "INNINGS_BREAK_PAUSE",
     "_cancel_timeout", "_start_timeout",
 ]
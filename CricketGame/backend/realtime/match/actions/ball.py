@@ -1,12 +1,20 @@
 """Core ball resolution, game_move, cancel_match, and countdown starters."""
 import asyncio
-import random
+from typing import Dict, Optional
 
 from ....game.game_engine import compute_potm
-from ..match_logging import record_cpu_history, log_ball_for_learning
-from ..match_persistence import save_match_stats, save_match_history
-from .timeouts import BALL_PICK_TIMEOUT, _cancel_timeout, _start_timeout
-from .captain import _start_captain_batter_pick, _start_captain_bowler_pick
+from ..match_logging import record_cpu_history, log_ball_for_learning, flush_ball_log
+from ..match_persistence import save_match_history, save_match_records
+from .timeouts import (
+    BALL_PICK_TIMEOUT, INNINGS_BREAK_PAUSE,
+    _cancel_all_timeouts, _cancel_timeout, _start_timeout, _timeout_running,
+)
+from .captain import (
+    _handle_auto_strike,
+    _start_captain_batter_pick,
+    _start_captain_bowler_pick,
+    _trigger_captain_picks_if_needed,
+)
 
 
 # ─── Ball-pick countdown tasks ────────────────────────────────────────────────
@@ -21,8 +29,7 @@ async def _bat_countdown(manager, room, username: str) -> None:
     if not innings or innings.striker != username:
         return
 
-    room.pending_moves["bat"] = random.randint(0, 6)
-    from .captain import _handle_auto_strike
+    room.pending_moves["bat"] = room.rng.randint(0, 6)
     await _handle_auto_strike(manager, room, username, "bat")
     innings = match.active_innings  # re-fetch in case it changed
     if innings:
@@ -39,16 +46,19 @@ async def _bowl_countdown(manager, room, username: str) -> None:
     if not innings or innings.current_bowler != username:
         return
 
-    room.pending_moves["bowl"] = random.randint(0, 6)
-    from .captain import _handle_auto_strike
+    room.pending_moves["bowl"] = room.rng.randint(0, 6)
     await _handle_auto_strike(manager, room, username, "bowl")
     innings = match.active_innings
     if innings:
         await resolve_pending_ball(manager, room, innings)
 
 
-def start_ball_countdowns(manager, room, innings) -> None:
-    """Start 10-second timers for the active human batter and/or bowler."""
+def start_ball_countdowns(manager, room, innings, notices: Optional[Dict[str, dict]] = None) -> None:
+    """
+    Start 10-second timers for the active human batter and/or bowler.
+    With `notices`, each player's COUNTDOWN is stored there for the caller to
+    deliver alongside the next state update instead of being sent on its own.
+    """
     # Never start countdowns while captain selection is pending
     if innings.needs_batter_choice or innings.needs_bowler_choice:
         return
@@ -56,21 +66,76 @@ def start_ball_countdowns(manager, room, innings) -> None:
     striker = innings.striker
     bowler = innings.current_bowler
 
-    if not manager._is_cpu(room, striker) and "bat" not in room.pending_moves:
+    # A countdown already running for this ball keeps its deadline and notice
+    if not manager._is_cpu(room, striker) and "bat" not in room.pending_moves and not _timeout_running(room, "bat"):
         _start_timeout(room, "bat", _bat_countdown(manager, room, striker))
         # Notify the batter's client to start their countdown timer
         p = room.players.get(striker)
         if p:
-            import asyncio
-            asyncio.create_task(manager.send(p, {"type": "COUNTDOWN", "role": "bat", "seconds": BALL_PICK_TIMEOUT}))
+            notice = {"type": "COUNTDOWN", "role": "bat", "seconds": BALL_PICK_TIMEOUT}
+            if notices is not None:
+                notices[striker] = notice
+            else:
+                asyncio.create_task(manager.send(p, notice))
 
-    if not manager._is_cpu(room, bowler) and "bowl" not in room.pending_moves:
+    if not manager._is_cpu(room, bowler) and "bowl" not in room.pending_moves and not _timeout_running(room, "bowl"):
         _start_timeout(room, "bowl", _bowl_countdown(manager, room, bowler))
         # Notify the bowler's client to start their countdown timer
         p = room.players.get(bowler)
         if p:
-            import asyncio
-            asyncio.create_task(manager.send(p, {"type": "COUNTDOWN", "role": "bowl", "seconds": BALL_PICK_TIMEOUT}))
+            notice = {"type": "COUNTDOWN", "role": "bowl", "seconds": BALL_PICK_TIMEOUT}
+            if notices is not None:
+                notices[bowler] = notice
+            else:
+                asyncio.create_task(manager.send(p, notice))
+
+
+# ─── Innings transitions ──────────────────────────────────────────────────────
+
+def _next_innings_transition(room, match, innings):
+    """
+    Return (INNINGS_BREAK extras, start-next-innings callable) when the completed
+    innings leads into another one, or None when the match is over.
+    """
+    current = match.current_innings
+    playoff = room.tournament and room.tournament.phase != "group"
+    target = innings.total_runs + 1
+    if current == 1:
+        return {"target": target}, match.start_innings_2
+    if current == 2 and playoff and match.innings_1.total_runs == innings.total_runs:
+        return {"target": target, "msg": "SUPER OVER: INNINGS 1"}, match.start_innings_3
+    if current == 3:
+        return {"target": target, "msg": "SUPER OVER: INNINGS 2"}, match.start_innings_4
+    if current == 4 and playoff and match.innings_3 and match.innings_3.total_runs == innings.total_runs:
+        return {"target": None, "msg": "SUPER OVER TIED - ANOTHER SUPER OVER"}, match.start_innings_3
+    return None
+
+
+async def _run_innings_break(manager, room, match, innings, extra: dict, start_next) -> None:
+    """Announce the break and start the next innings; play resumes from a timeout task."""
+    await manager.broadcast(room, {
+        "type": "INNINGS_BREAK",
+        "scorecard": innings.get_scorecard(),
+        **extra,
+    })
+    room.auto_move_strikes.clear()   # strikes are counted per innings
+    start_next()
+    _start_timeout(room, "innings_break", _resume_after_innings_break(manager, room, match))
+
+
+async def _resume_after_innings_break(manager, room, match) -> None:
+    """After the break pause, push state and restart countdowns / CPU play."""
+    await asyncio.sleep(INNINGS_BREAK_PAUSE)
+    room.pending_timeouts.pop("innings_break", None)
+    if room.match is not match:
+        return
+    new_innings = match.active_innings
+    await manager._send_match_state(room)
+    if new_innings:
+        await _trigger_captain_picks_if_needed(manager, room, new_innings)
+        start_ball_countdowns(manager, room, new_innings)
+    await manager._maybe_cpu_move(room, new_innings)
+    await manager._auto_play_cpu_match(room)
 
 
 # ─── Core ball resolution ─────────────────────────────────────────────────────
@@ -93,120 +158,38 @@ async def resolve_pending_ball(manager, room, innings) -> bool:
     result = innings.resolve_ball(bat_move, bowl_move)
     record_cpu_history(manager, room, innings, bat_move, bowl_move)
     log_ball_for_learning(manager, room, match, innings, bat_move, bowl_move, result)
-    room.pending_moves = {}
-
-    await manager.broadcast(room, {"type": "BALL_RESULT", **result})
+    room.pending_moves.clear()
+
+    ball_msg = {"type": "BALL_RESULT", **result}
+    # CPU-vs-CPU ball with play continuing: deliver the result in one frame with the next state
+    batch_ball = (
+        not result["innings_complete"]
+        and not result.get("needs_batter_choice")
+        and not result.get("needs_bowler_choice")
+        and manager._is_cpu(room, result["striker"])
+        and manager._is_cpu(room, result["bowler"])
+    )
+    if not batch_ball:
+        await manager.broadcast(room, ball_msg)
 
     # ── Innings complete ──────────────────────────────────────────────────────
     if result.get("innings_complete"):
-        if match.current_innings == 1:
-            scorecard = innings.get_scorecard()
-            target = innings.total_runs + 1
-            await manager.broadcast(room, {
-                "type": "INNINGS_BREAK",
-                "scorecard": scorecard,
-                "target": target,
-            })
-            room.auto_move_strikes = {}   # reset strikes for innings 2
-            match.start_innings_2()
-            await asyncio.sleep(2)
-            new_innings = match.active_innings
-            await manager._send_match_state(room)
-            if new_innings:
-                from .captain import _trigger_captain_picks_if_needed
-                await _trigger_captain_picks_if_needed(manager, room, new_innings)
-                start_ball_countdowns(manager, room, new_innings)
-            await manager._maybe_cpu_move(room, new_innings)
-            await manager._auto_play_cpu_match(room)
-            return True
-
-        if (
-            match.current_innings == 2
-            and match.innings_1.total_runs == innings.total_runs
-            and room.tournament
-            and room.tournament.phase != "group"
-        ):
-            scorecard = innings.get_scorecard()
-            target = innings.total_runs + 1
-            await manager.broadcast(room, {
-                "type": "INNINGS_BREAK",
-                "scorecard": scorecard,
-                "target": target,
-                "msg": "SUPER OVER: INNINGS 1",
-            })
-            room.auto_move_strikes = {}
-            match.start_innings_3()
-            await asyncio.sleep(2)
-            new_innings = match.active_innings
-            await manager._send_match_state(room)
-            if new_innings:
-                from .captain import _trigger_captain_picks_if_needed
-                await _trigger_captain_picks_if_needed(manager, room, new_innings)
-                start_ball_countdowns(manager, room, new_innings)
-            await manager._maybe_cpu_move(room, new_innings)
-            await manager._auto_play_cpu_match(room)
-            return True
-
-        if match.current_innings == 3:
-            scorecard = innings.get_scorecard()
-            target = innings.total_runs + 1
-            await manager.broadcast(room, {
-                "type": "INNINGS_BREAK",
-                "scorecard": scorecard,
-                "target": target,
-                "msg": "SUPER OVER: INNINGS 2",
-            })
-            room.auto_move_strikes = {}
-            match.start_innings_4()
-            await asyncio.sleep(2)
-            new_innings = match.active_innings
-            await manager._send_match_state(room)
-            if new_innings:
-                from .captain import _trigger_captain_picks_if_needed
-                await _trigger_captain_picks_if_needed(manager, room, new_innings)
-                start_ball_countdowns(manager, room, new_innings)
-            await manager._maybe_cpu_move(room, new_innings)
-            await manager._auto_play_cpu_match(room)
-            return True
-
-        # ── Match over ───────────────────────────────────────────────────────
         if match.current_innings == 4:
             match.snapshot_super_over_round()
 
-        if (
-            match.current_innings == 4
-            and room.tournament
-            and room.tournament.phase != "group"
-            and getattr(match, "innings_3", None)
-            and match.innings_3.total_runs == innings.total_runs
-        ):
-            scorecard = innings.get_scorecard()
-            await manager.broadcast(room, {
-                "type": "INNINGS_BREAK",
-                "scorecard": scorecard,
-                "target": None,
-                "msg": "SUPER OVER TIED - ANOTHER SUPER OVER",
-            })
-            room.auto_move_strikes = {}
-            match.start_innings_3()
-            await asyncio.sleep(2)
-            new_innings = match.active_innings
-            await manager._send_match_state(room)
-            if new_innings:
-                from .captain import _trigger_captain_picks_if_needed
-                await _trigger_captain_picks_if_needed(manager, room, new_innings)
-                start_ball_countdowns(manager, room, new_innings)
-            await manager._maybe_cpu_move(room, new_innings)
-            await manager._auto_play_cpu_match(room)
+        transition = _next_innings_transition(room, match, innings)
+        if transition:
+            extra, start_next = transition
+            await _run_innings_break(manager, room, match, innings, extra, start_next)
             return True
 
+        # ── Match over ───────────────────────────────────────────────────────
         final = match.determine_result()
         potm_data = compute_potm(match)
         final["potm"] = potm_data
 
         # Cancel all pending timeouts before match teardown
-        for key in list(room.pending_timeouts.keys()):
-            _cancel_timeout(room, key)
+        _cancel_all_timeouts(room)
 
         if room.tournament:
             tournament_payload = manager._apply_tournament_result(room, match)
@@ -215,12 +198,12 @@ async def resolve_pending_ball(manager, room, innings) -> bool:
         else:
             await manager.broadcast(room, {"type": "MATCH_OVER", **final})
 
-        save_match_stats(manager, room, match)
+        flush_ball_log(room)
         tournament_id = room.tournament_id if room.tournament else None
-        save_match_history(manager, room, match, potm_data, tournament_id)
+        save_match_records(manager, room, match, potm_data, tournament_id)
 
         room.match = None
-        room.pending_moves = {}
+        room.pending_moves.clear()
 
         if room.tournament:
             await asyncio.sleep(3)
@@ -242,8 +225,9 @@ async def resolve_pending_ball(manager, room, innings) -> bool:
         return True
 
     # ── Normal ball — send state and arm next countdown ───────────────────────
-    await manager._send_match_state(room)
-    start_ball_countdowns(manager, room, innings)
+    notices = {}
+    start_ball_countdowns(manager, room, innings, notices)
+    await manager._send_match_state(room, batch_with=[ball_msg] if batch_ball else None, follow_up=notices)
     await manager._maybe_cpu_move(room, innings)
     await manager._auto_play_cpu_match(room)
     return True
@@ -310,12 +294,12 @@ async def cancel_match(manager, room, player) -> None:
     if not match or match.is_finished:
         return
 
-    for key in list(room.pending_timeouts.keys()):
-        _cancel_timeout(room, key)
+    _cancel_all_timeouts(room)
 
     match.result_text = "Match Cancelled by Host"
     match.winner = None
     match.is_finished = True
+    flush_ball_log(room)
 
     if room.tournament:
         tournament_payload = manager._apply_tournament_cancellation(room, match)
@@ -327,13 +311,13 @@ async def cancel_match(manager, room, player) -> None:
         await manager.broadcast(room, {"type": "TOURNAMENT_STANDINGS", **tournament_payload})
         save_match_history(manager, room, match, None, room.tournament_id)
         room.match = None
-        room.pending_moves = {}
+        room.pending_moves.clear()
         await asyncio.sleep(3)
         await manager._start_next_tournament_match(room)
     else:
         await manager.broadcast(room, {"type": "MATCH_CANCELLED", "msg": "Match Cancelled by Host"})
         save_match_history(manager, room, match, None, None)
         room.match = None
-        room.pending_moves = {}
+        room.pending_moves.clear()
         await manager.broadcast_lobby(room)
 
@@ -2,10 +2,13 @@
 import asyncio
 
 from ....game.game_engine import compute_potm
-from ..match_persistence import save_match_history, save_match_stats
+from ..match_logging import flush_ball_log
+from ..match_persistence import save_match_records
+# Module reference: ball.py imports this module, so its names resolve at call time
+from . import ball as ball_actions
 from .timeouts import (
     CAPTAIN_PICK_TIMEOUT, MAX_AUTO_STRIKES,
-    _cancel_timeout, _start_timeout,
+    _cancel_all_timeouts, _cancel_timeout, _start_delayed_timeout,
 )
 
 
@@ -13,12 +16,17 @@ from .timeouts import (
 
 def _team_for_side(room, side: list) -> str | None:
     """Return the team key whose member list overlaps with *side*."""
-    if not side:
-        return None
-    for key, members in room.teams.items():
-        if any(p in members for p in side):
-            return key
-    return None
+    return room.team_for_side(side)
+
+
+def _side_captains(room, innings) -> tuple:
+    """(batting captain, bowling captain) for *innings*, read from the room's current captains."""
+    # Only the team keys are cached (on the room); captains can change mid-innings
+    batting_team, bowling_team = room.side_teams(innings)
+    return (
+        room.captains.get(batting_team) if batting_team else None,
+        room.captains.get(bowling_team) if bowling_team else None,
+    )
 
 
 # ─── Auto-strike recording ────────────────────────────────────────────────────
@@ -27,19 +35,19 @@ def _build_match_over_payload(match) -> dict:
     payload = {
         "winner": match.winner,
         "result_text": match.result_text,
-        "scorecard_1": match.innings_1.get_scorecard() if getattr(match, "innings_1", None) else {},
-        "scorecard_2": match.innings_2.get_scorecard() if getattr(match, "innings_2", None) else {},
+        "scorecard_1": match.innings_1.get_scorecard() if match.innings_1 else {},
+        "scorecard_2": match.innings_2.get_scorecard() if match.innings_2 else {},
         "side_a": match.side_a,
         "side_b": match.side_b,
         "bat_team_1": match.batting_first,
         "bat_team_2": match.bowling_first,
     }
     if match.is_super_over:
-        payload["scorecard_3"] = match.innings_3.get_scorecard() if getattr(match, "innings_3", None) else {}
-        payload["scorecard_4"] = match.innings_4.get_scorecard() if getattr(match, "innings_4", None) else {}
+        payload["scorecard_3"] = match.innings_3.get_scorecard() if match.innings_3 else {}
+        payload["scorecard_4"] = match.innings_4.get_scorecard() if match.innings_4 else {}
         payload["bat_team_3"] = match.bowling_first
         payload["bat_team_4"] = match.batting_first
-        payload["super_over_timeline"] = match.get_super_over_timeline() if hasattr(match, "get_super_over_timeline") else []
+        payload["super_over_timeline"] = match.get_super_over_timeline()
     return payload
 
 
@@ -62,9 +70,8 @@ async def _forfeit_match_for_non_response(manager, room, offender: str) -> None:
     # Forced outcomes should not affect tournament NRR tables.
     match.nrr_locked = True
 
-    for key in list(room.pending_timeouts.keys()):
-        _cancel_timeout(room, key)
-    room.pending_moves = {}
+    _cancel_all_timeouts(room)
+    room.pending_moves.clear()
 
     final = _build_match_over_payload(match)
     potm_data = compute_potm(match)
@@ -77,12 +84,12 @@ async def _forfeit_match_for_non_response(manager, room, offender: str) -> None:
     else:
         await manager.broadcast(room, {"type": "MATCH_OVER", **final})
 
-    save_match_stats(manager, room, match)
+    flush_ball_log(room)
     tournament_id = room.tournament_id if room.tournament else None
-    save_match_history(manager, room, match, potm_data, tournament_id)
+    save_match_records(manager, room, match, potm_data, tournament_id)
 
     room.match = None
-    room.pending_moves = {}
+    room.pending_moves.clear()
 
     if room.tournament:
         await asyncio.sleep(3)
@@ -99,6 +106,10 @@ async def _handle_auto_strike(manager, room, username: str, role: str) -> None:
     """
     strikes = room.auto_move_strikes.get(username, 0) + 1
     room.auto_move_strikes[username] = strikes
+    is_captain_pick = role in ("captain_bat", "captain_bowl")
+    # Captain picks only ever warn; past the final warning there is nothing new to say
+    if is_captain_pick and strikes > MAX_AUTO_STRIKES:
+        return
     await manager.broadcast(room, {
         "type": "AUTO_MOVE_WARNING",
         "player": username,
@@ -113,51 +124,53 @@ async def _handle_auto_strike(manager, room, username: str, role: str) -> None:
         return
 
     # Captain timeout should not force-dismiss players; warning-only behavior.
-    if role in ("captain_bat", "captain_bowl"):
+    if is_captain_pick:
         return
 
     if role in ("bat", "bowl"):
         await _forfeit_match_for_non_response(manager, room, username)
 
 
+# ─── Resume play after a pick ─────────────────────────────────────────────────
+
+async def _resume_play(manager, room, innings) -> None:
+    """Push the new state, restart ball countdowns and let CPUs continue."""
+    notices = {}
+    ball_actions.start_ball_countdowns(manager, room, innings, notices)
+    await manager._send_match_state(room, follow_up=notices)
+    await manager._maybe_cpu_move(room, innings)
+    await manager._auto_play_cpu_match(room)
+
+
+async def _apply_and_resume(manager, room, innings, apply_fn, choice) -> None:
+    apply_fn(choice)
+    await _resume_play(manager, room, innings)
+
+
 # ─── Captain timeout callbacks ────────────────────────────────────────────────
 
 async def _captain_batter_timeout(manager, room, innings, captain: str) -> None:
-    """5-second timeout: auto-pick the first enabled batter for the captain."""
-    await asyncio.sleep(CAPTAIN_PICK_TIMEOUT)
+    """Captain pick expired: auto-pick the first enabled batter."""
     if not room.match or not innings.needs_batter_choice:
         return
-    options = innings.available_next_batters()
-    enabled = [o for o in options if not o["disabled"]]
-    choice = enabled or options
-    if not choice:
+    choice = innings.batter_pick_options().first_choice
+    if choice is None:
         return
-    innings.apply_batter_choice(choice[0]["player"])
+    innings.apply_batter_choice(choice)
     await _handle_auto_strike(manager, room, captain, "captain_bat")
-    await manager._send_match_state(room)
-    from .ball import start_ball_countdowns
-    start_ball_countdowns(manager, room, innings)
-    await manager._maybe_cpu_move(room, innings)
-    await manager._auto_play_cpu_match(room)
+    await _resume_play(manager, room, innings)
 
 
 async def _captain_bowler_timeout(manager, room, innings, captain: str) -> None:
-    """5-second timeout: auto-pick the first enabled bowler for the captain."""
-    await asyncio.sleep(CAPTAIN_PICK_TIMEOUT)
+    """Captain pick expired: auto-pick the first enabled bowler."""
     if not room.match or not innings.needs_bowler_choice:
         return
-    options = innings.available_next_bowlers()
-    enabled = [o for o in options if not o["disabled"]]
-    choice = enabled or options
-    if not choice:
+    choice = innings.bowler_pick_options().first_choice
+    if choice is None:
         return
-    innings.apply_bowler_choice(choice[0]["player"])
+    innings.apply_bowler_choice(choice)
     await _handle_auto_strike(manager, room, captain, "captain_bowl")
-    await manager._send_match_state(room)
-    from .ball import start_ball_countdowns
-    start_ball_countdowns(manager, room, innings)
-    await manager._maybe_cpu_move(room, innings)
-    await manager._auto_play_cpu_match(room)
+    await _resume_play(manager, room, innings)
 
 
 # ─── Captain pick initiators ──────────────────────────────────────────────────
@@ -175,94 +188,64 @@ async def _trigger_captain_picks_if_needed(manager, room, innings) -> bool:
 
 async def _start_captain_batter_pick(manager, room, innings) -> None:
     """Notify batting captain to pick next batter; start 5-second timeout."""
-    batting_team = _team_for_side(room, innings.batting_side)
-    captain = room.captains.get(batting_team) if batting_team else None
-    if not captain:
-        # No captain assigned (1v1 / CPU mode) → auto-pick and resume play
-        options = innings.available_next_batters()
-        enabled = [o for o in options if not o["disabled"]]
-        choice = enabled or options
-        if choice:
-            innings.apply_batter_choice(choice[0]["player"])
-        await manager._send_match_state(room)
-        from .ball import start_ball_countdowns
-        start_ball_countdowns(manager, room, innings)
-        await manager._maybe_cpu_move(room, innings)
-        await manager._auto_play_cpu_match(room)
+    captain = _side_captains(room, innings)[0]
+    picks = innings.batter_pick_options()
+    # No captain assigned (1v1 / CPU mode), or nothing to choose → auto-pick and resume play
+    if not captain or len(picks.valid_names) <= 1:
+        if picks.first_choice is not None:
+            innings.apply_batter_choice(picks.first_choice)
+        await _resume_play(manager, room, innings)
         return
 
-    options = innings.available_next_batters()
     await manager.broadcast(room, {
         "type": "CHOOSE_BATTER",
         "captain": captain,
-        "options": options,
+        "options": picks.options,
         "timeout": CAPTAIN_PICK_TIMEOUT,
     })
 
     if manager._is_cpu(room, captain):
-        enabled = [o for o in options if not o["disabled"]]
-        chosen_list = enabled or options
-        if chosen_list:
-            innings.apply_batter_choice(chosen_list[0]["player"])
-            await manager._send_match_state(room)
-            from .ball import start_ball_countdowns
-            start_ball_countdowns(manager, room, innings)
-            await manager._maybe_cpu_move(room, innings)
-            await manager._auto_play_cpu_match(room)
+        if picks.first_choice is not None:
+            await _apply_and_resume(manager, room, innings,
+                                    innings.apply_batter_choice, picks.first_choice)
     else:
-        _start_timeout(room, "captain_bat",
-                       _captain_batter_timeout(manager, room, innings, captain))
+        _start_delayed_timeout(room, "captain_bat", CAPTAIN_PICK_TIMEOUT,
+                               _captain_batter_timeout, manager, room, innings, captain)
         # Notify captain to start their countdown timer
         p = room.players.get(captain)
         if p:
-            import asyncio
-            asyncio.create_task(manager.send(p, {"type": "COUNTDOWN", "role": "captain", "seconds": CAPTAIN_PICK_TIMEOUT}))
+            await manager.send(p, {"type": "COUNTDOWN", "role": "captain", "seconds": CAPTAIN_PICK_TIMEOUT})
 
 
 async def _start_captain_bowler_pick(manager, room, innings) -> None:
     """Notify bowling captain to pick next bowler; start 5-second timeout."""
-    bowling_team = _team_for_side(room, innings.bowling_side)
-    captain = room.captains.get(bowling_team) if bowling_team else None
-    if not captain:
-        # No captain assigned (1v1 / CPU mode) → auto-pick and resume play
-        options = innings.available_next_bowlers()
-        enabled = [o for o in options if not o["disabled"]]
-        choice = enabled or options
-        if choice:
-            innings.apply_bowler_choice(choice[0]["player"])
-        await manager._send_match_state(room)
-        from .ball import start_ball_countdowns
-        start_ball_countdowns(manager, room, innings)
-        await manager._maybe_cpu_move(room, innings)
-        await manager._auto_play_cpu_match(room)
+    captain = _side_captains(room, innings)[1]
+    picks = innings.bowler_pick_options()
+    # No captain assigned (1v1 / CPU mode), or nothing to choose → auto-pick and resume play
+    if not captain or len(picks.valid_names) <= 1:
+        if picks.first_choice is not None:
+            innings.apply_bowler_choice(picks.first_choice)
+        await _resume_play(manager, room, innings)
         return
 
-    options = innings.available_next_bowlers()
     await manager.broadcast(room, {
         "type": "CHOOSE_BOWLER",
         "captain": captain,
-        "options": options,
+        "options": picks.options,
         "timeout": CAPTAIN_PICK_TIMEOUT,
     })
 
     if manager._is_cpu(room, captain):
-        enabled = [o for o in options if not o["disabled"]]
-        chosen_list = enabled or options
-        if chosen_list:
-            innings.apply_bowler_choice(chosen_list[0]["player"])
-            await manager._send_match_state(room)
-            from .ball import start_ball_countdowns
-            start_ball_countdowns(manager, room, innings)
-            await manager._maybe_cpu_move(room, innings)
-            await manager._auto_play_cpu_match(room)
+        if picks.first_choice is not None:
+            await _apply_and_resume(manager, room, innings,
+                                    innings.apply_bowler_choice, picks.first_choice)
     else:
-        _start_timeout(room, "captain_bowl",
-                       _captain_bowler_timeout(manager, room, innings, captain))
+        _start_delayed_timeout(room, "captain_bowl", CAPTAIN_PICK_TIMEOUT,
+                               _captain_bowler_timeout, manager, room, innings, captain)
         # Notify captain to start their countdown timer
         p = room.players.get(captain)
         if p:
-            import asyncio
-            asyncio.create_task(manager.send(p, {"type": "COUNTDOWN", "role": "captain", "seconds": CAPTAIN_PICK_TIMEOUT}))
+            await manager.send(p, {"type": "COUNTDOWN", "role": "captain", "seconds": CAPTAIN_PICK_TIMEOUT})
 
 
 # ─── Public handlers (called from manager.py) ─────────────────────────────────
@@ -276,25 +259,18 @@ async def handle_pick_batter(manager, room, player, msg: dict) -> None:
     if not innings or not innings.needs_batter_choice:
         return
 
-    batting_team = _team_for_side(room, innings.batting_side)
-    captain = room.captains.get(batting_team) if batting_team else None
+    captain = _side_captains(room, innings)[0]
     if player.username != captain:
         return
 
     chosen = msg.get("player")
-    options = innings.available_next_batters()
-    valid_names = [o["player"] for o in options if not o["disabled"]] or \
-                  [o["player"] for o in options]
-    if chosen not in valid_names:
+    picks = innings.batter_pick_options()
+    # The UI default is the first choice, so most submissions skip the set lookup
+    if chosen != picks.first_choice and chosen not in picks.valid_names:
         return
 
     _cancel_timeout(room, "captain_bat")
-    innings.apply_batter_choice(chosen)
-    await manager._send_match_state(room)
-    from .ball import start_ball_countdowns
-    start_ball_countdowns(manager, room, innings)
-    await manager._maybe_cpu_move(room, innings)
-    await manager._auto_play_cpu_match(room)
+    await _apply_and_resume(manager, room, innings, innings.apply_batter_choice, chosen)
 
 
 async def handle_pick_bowler(manager, room, player, msg: dict) -> None:
@@ -306,22 +282,15 @@ async def handle_pick_bowler(manager, room, player, msg: dict) -> None:
     if not innings or not innings.needs_bowler_choice:
         return
 
-    bowling_team = _team_for_side(room, innings.bowling_side)
-    captain = room.captains.get(bowling_team) if bowling_team else None
+    captain = _side_captains(room, innings)[1]
     if player.username != captain:
         return
 
     chosen = msg.get("player")
-    options = innings.available_next_bowlers()
-    valid_names = [o["player"] for o in options if not o["disabled"]] or \
-                  [o["player"] for o in options]
-    if chosen not in valid_names:
+    picks = innings.bowler_pick_options()
+    # The UI default is the first choice, so most submissions skip the set lookup
+    if chosen != picks.first_choice and chosen not in picks.valid_names:
         return
 
     _cancel_timeout(room, "captain_bowl")
-    innings.apply_bowler_choice(chosen)
-    await manager._send_match_state(room)
-    from .ball import start_ball_countdowns
-    start_ball_countdowns(manager, room, innings)
-    await manager._maybe_cpu_move(room, innings)
-    await manager._auto_play_cpu_match(room)
+    await _apply_and_resume(manager, room, innings, innings.apply_bowler_choice, chosen)
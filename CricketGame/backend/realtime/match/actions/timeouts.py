@@ -4,16 +4,56 @@ import asyncio
 BALL_PICK_TIMEOUT = 10      # seconds a human has to pick their number
 CAPTAIN_PICK_TIMEOUT = 5    # seconds captain has to pick next batter/bowler
 MAX_AUTO_STRIKES = 3        # auto-plays before the player forfeits
+INNINGS_BREAK_PAUSE = 2     # seconds between innings before play resumes
 
 
 def _cancel_timeout(room, key: str) -> None:
-    """Cancel a pending timeout task if it exists and is still running."""
+    """
+    Cancel a pending timeout if it exists and is still running.
+    A timeout that is itself doing the cancelling (e.g. an expired countdown
+    resolving the ball) is only dropped, so it can finish its own work.
+    """
     task = room.pending_timeouts.pop(key, None)
-    if task and not task.done():
+    if task is None:
+        return
+    if isinstance(task, asyncio.TimerHandle):
         task.cancel()
+    elif not task.done() and task is not asyncio.current_task():
+        task.cancel()
+
+
+def _cancel_all_timeouts(room) -> None:
+    for key in list(room.pending_timeouts):
+        _cancel_timeout(room, key)
+
+
+def _timeout_running(room, key: str) -> bool:
+    task = room.pending_timeouts.get(key)
+    if isinstance(task, asyncio.TimerHandle):
+        return not task.cancelled()
+    return task is not None and not task.done()
+
+
+def _schedule_after(delay: float, callback) -> asyncio.TimerHandle:
+    return asyncio.get_running_loop().call_later(delay, callback)
 
 
 def _start_timeout(room, key: str, coro) -> None:
     """Start an asyncio task for a timeout, storing it for later cancellation."""
     _cancel_timeout(room, key)
     room.pending_timeouts[key] = asyncio.create_task(coro)
+
+
+def _start_delayed_timeout(room, key: str, delay: float, coro_fn, *args) -> None:
+    """
+    Run coro_fn(*args) once *delay* seconds pass. Until then only a timer
+    handle is stored; the coroutine and its task are created when it fires.
+    """
+    _cancel_timeout(room, key)
+
+    def fire() -> None:
+        if room.pending_timeouts.get(key) is handle:
+            room.pending_timeouts[key] = asyncio.create_task(coro_fn(*args))
+
+    handle = _schedule_after(delay, fire)
+    room.pending_timeouts[key] = handle
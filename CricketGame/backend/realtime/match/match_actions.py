@@ -2,7 +2,7 @@
 match_actions.py — backward-compatible shim.
 
 All logic has been moved into the `actions/` sub-package:
-  actions/timeouts.py   — BALL_PICK_TIMEOUT, CAPTAIN_PICK_TIMEOUT, MAX_AUTO_STRIKES, helpers
+  actions/timeouts.py   — BALL_PICK_TIMEOUT, CAPTAIN_PICK_TIMEOUT, MAX_AUTO_STRIKES, INNINGS_BREAK_PAUSE, helpers
   actions/captain.py    — captain pick handlers, auto-strike, captain timeouts
   actions/ball.py       — resolve_pending_ball, game_move, cancel_match, start_ball_countdowns
 
@@ -16,16 +16,18 @@ from .actions import (
     handle_pick_batter,
     handle_pick_bowler,
     _team_for_side,
+    _side_captains,
     BALL_PICK_TIMEOUT,
     CAPTAIN_PICK_TIMEOUT,
     MAX_AUTO_STRIKES,
+    INNINGS_BREAK_PAUSE,
     _cancel_timeout,
     _start_timeout,
 )
 
 __all__ = [
     "resolve_pending_ball", "game_move", "cancel_match", "start_ball_countdowns",
-    "handle_pick_batter", "handle_pick_bowler", "_team_for_side",
-    "BALL_PICK_TIMEOUT", "CAPTAIN_PICK_TIMEOUT", "MAX_AUTO_STRIKES",
+    "handle_pick_batter", "handle_pick_bowler", "_team_for_side", "_side_captains",
+    "BALL_PICK_TIMEOUT", "CAPTAIN_PICK_TIMEOUT", "MAX_AUTO_STRIKES", "INNINGS_BREAK_PAUSE",
     "_cancel_timeout", "_start_timeout",
 ]
@@ -1,44 +1,62 @@
 from ...game.game_engine import Match
-from ...cpu.cpu_ball_logger import log_ball_async
+from ...cpu.cpu_ball_logger import log_balls_async
+from ..models import new_cpu_history
+
+# Balls buffered per room before they are written in one batch
+BALL_LOG_BATCH = 50
+
+
+def _cpu_history_for(room, name: str) -> dict:
+    history = room.cpu_history.get(name)
+    if history is None:
+        history = room.cpu_history[name] = new_cpu_history()
+    return history
 
 
 def record_cpu_history(manager, room, innings, bat_move: int, bowl_move: int) -> None:
     if not room.cpu_enabled:
         return
-    if innings.striker in room.cpu_names:
-        room.cpu_history.setdefault(innings.striker, {"bat": [], "bowl": []})
-        room.cpu_history[innings.striker]["bowl"].append(bowl_move)
-    if innings.current_bowler in room.cpu_names:
-        room.cpu_history.setdefault(innings.current_bowler, {"bat": [], "bowl": []})
-        room.cpu_history[innings.current_bowler]["bat"].append(bat_move)
+    if innings.striker in room.cpu_name_set:
+        _cpu_history_for(room, innings.striker)["bowl"].append(bowl_move)
+    if innings.current_bowler in room.cpu_name_set:
+        _cpu_history_for(room, innings.current_bowler)["bat"].append(bat_move)
 
 
 def log_ball_for_learning(manager, room, match: Match, innings, bat_move: int, bowl_move: int, result: dict) -> None:
-    if innings.striker in room.cpu_names and innings.current_bowler in room.cpu_names:
+    if innings.striker in room.cpu_name_set and innings.current_bowler in room.cpu_name_set:
+        return
+    balls_bowled = innings.overs_completed * 6 + innings.balls_in_over
+    balls_remaining = innings.total_balls - balls_bowled
+    batting_first = match.current_innings == 1
+    room.ball_log_buffer.append({
+        "match_id": match.id,
+        "ball_number": result.get("ball_num", balls_bowled),
+        "batter_username": innings.striker,
+        "bowler_username": innings.current_bowler,
+        "bat_move": bat_move,
+        "bowl_move": bowl_move,
+        "runs_scored": result.get("runs", 0),
+        "is_out": result.get("is_out", False),
+        "match_format_overs": match.total_overs,
+        "current_over": innings.overs_completed,
+        "total_overs": innings.total_overs,
+        "innings": match.current_innings,
+        "batting_score": innings.total_runs,
+        "batting_wickets": innings.wickets_fallen,
+        "target": innings.target,
+        "balls_remaining": balls_remaining,
+        "batting_first": batting_first,
+    })
+    if len(room.ball_log_buffer) >= BALL_LOG_BATCH:
+        flush_ball_log(room)
+
+
+def flush_ball_log(room) -> None:
+    """Hand the buffered balls to the background logger; called on match end too."""
+    if not room.ball_log_buffer:
         return
     try:
-        balls_bowled = innings.overs_completed * 6 + innings.balls_in_over
-        total_balls = innings.total_overs * 6
-        balls_remaining = total_balls - balls_bowled
-        batting_first = match.current_innings == 1
-        log_ball_async(
-            match_id=match.id,
-            ball_number=result.get("ball_num", balls_bowled),
-            batter_username=innings.striker,
-            bowler_username=innings.current_bowler,
-            bat_move=bat_move,
-            bowl_move=bowl_move,
-            runs_scored=result.get("runs", 0),
-            is_out=result.get("is_out", False),
-            match_format_overs=match.total_overs,
-            current_over=innings.overs_completed,
-            total_overs=innings.total_overs,
-            innings=match.current_innings,
-            batting_score=innings.total_runs,
-            batting_wickets=innings.wickets_fallen,
-            target=innings.target,
-            balls_remaining=balls_remaining,
-            batting_first=batting_first,
-        )
+        log_balls_async(room.ball_log_buffer)
     except Exception as e:
         print(f"⚠ Error logging ball for learning: {e}")
+    room.ball_log_buffer = []
@@ -1,103 +1,167 @@
-import json
-from datetime import datetime
+import asyncio
+from functools import partial
+from datetime import datetime, timezone
 
-from ...data.database import SessionLocal
-from ...core.auth import update_player_stats
-from ...data.models import MatchHistory
+from ...data.database import session_scope
+from ...core.auth import bulk_update_player_stats
+from ...data.models import MatchHistory, dump_json
 from ...game.game_engine import Match
+from ...game.match import _copy_scorecard
 
 
-def save_match_stats(manager, room, match: Match) -> None:
-    db = SessionLocal()
-    try:
-        # Normalize legacy "2v2" → "team" so stats always land on the team tab
-        game_format = match.mode
-        if game_format in ("2v2", "team"):
-            game_format = "team"
-
-        all_players = match.side_a + match.side_b
-        for player_name in all_players:
-            is_winner = match.winner and player_name in match.winner
-
-            bat_data = None
-            bowl_data = None
-
-            for inn in [match.innings_1, match.innings_2]:
-                if inn and player_name in inn.batting_cards:
-                    card = inn.batting_cards[player_name]
-                    bat_data = {
-                        "runs": card.runs, "balls": card.balls,
-                        "fours": card.fours, "sixes": card.sixes,
-                    }
-                if inn and player_name in inn.bowling_cards:
-                    card = inn.bowling_cards[player_name]
-                    bowl_data = {
-                        "wickets": card.wickets,
-                        "runs_conceded": card.runs_conceded,
-                        "overs": card.overs_completed + card.balls_bowled_in_over / 6,
-                    }
-
-            update_player_stats(db, player_name, game_format,
-                                batting_data=bat_data,
-                                bowling_data=bowl_data,
-                                won=is_winner)
-    finally:
-        db.close()
+def _innings_totals(match: Match) -> tuple:
+    """Per-player batting and bowling figures summed over both main innings."""
+    batting, bowling = {}, {}
+    for inn in (match.innings_1, match.innings_2):
+        if not inn:
+            continue
+        for name, card in inn.batting_cards.items():
+            bat = batting.setdefault(name, {"runs": 0, "balls": 0, "fours": 0, "sixes": 0})
+            bat["runs"] += card.runs
+            bat["balls"] += card.balls
+            bat["fours"] += card.fours
+            bat["sixes"] += card.sixes
+        for name, card in inn.bowling_cards.items():
+            bowl = bowling.setdefault(name, {"wickets": 0, "runs_conceded": 0, "overs": 0})
+            bowl["wickets"] += card.wickets
+            bowl["runs_conceded"] += card.runs_conceded
+            bowl["overs"] += card.overs_completed + card.balls_bowled_in_over / 6
+    return batting, bowling
 
 
-def save_match_history(manager, room, match: Match, potm_data: dict, tournament_id=None) -> None:
-    db = SessionLocal()
+def _write_match_stats(db, match: Match) -> None:
+    # Normalize legacy "2v2" → "team" so stats always land on the team tab
+    game_format = match.mode
+    if game_format in ("2v2", "team"):
+        game_format = "team"
+
+    batting, bowling = _innings_totals(match)
+    entries = {}
+    for player_name in match.side_a + match.side_b:
+        entries[player_name] = {
+            "batting_data": batting.get(player_name),
+            "bowling_data": bowling.get(player_name),
+            "won": match.winner and player_name in match.winner,
+        }
+
+    bulk_update_player_stats(db, game_format, entries)
+
+
+def _write_match_history(db, room_code: str, match: Match, potm_data: dict, tournament_id) -> None:
+    sc1 = match.innings_1.get_scorecard() if match.innings_1 else {}
+    sc2 = match.innings_2.get_scorecard() if match.innings_2 else {}
+    # Serialized straight away, so the live rounds need no detached copy
+    super_over_timeline = match.super_over_rounds
+    potm_payload = dict(potm_data) if isinstance(potm_data, dict) else None
+
+    if match.is_super_over and potm_payload is not None:
+        latest_round = super_over_timeline[-1] if super_over_timeline else None
+        if latest_round:
+            potm_payload["super_over_data"] = {
+                "scorecard_3": latest_round.get("scorecard_3") or {},
+                "scorecard_4": latest_round.get("scorecard_4") or {},
+                "bat_team_3": latest_round.get("bat_team_3") or match.bowling_first,
+                "bat_team_4": latest_round.get("bat_team_4") or match.batting_first,
+            }
+        else:
+            potm_payload["super_over_data"] = {
+                "scorecard_3": match.innings_3.get_scorecard() if match.innings_3 else {},
+                "scorecard_4": match.innings_4.get_scorecard() if match.innings_4 else {},
+                "bat_team_3": match.bowling_first,
+                "bat_team_4": match.batting_first,
+            }
+
+    history = MatchHistory(
+        match_id=match.id,
+        room_code=room_code,
+        mode=match.mode,
+        side_a=dump_json(match.side_a),
+        side_b=dump_json(match.side_b),
+        scorecard_1=dump_json(sc1),
+        scorecard_2=dump_json(sc2),
+        result_text=match.result_text,
+        winner=match.winner,
+        potm=potm_payload.get("player") if potm_payload else None,
+        potm_stats=dump_json(potm_payload) if potm_payload else None,
+        super_over_timeline=dump_json(super_over_timeline) if super_over_timeline else None,
+        tournament_id=tournament_id,
+        # Naive UTC, like the column's server default; utcnow() is deprecated
+        end_timestamp=datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+    db.add(history)
+
+
+def _record_tournament_match(room, match: Match) -> None:
+    """Track a finished match for the tournament's history row and awards."""
+    room.tournament_match_ids.append(match.id)
+    room.tournament_scorecards.append({
+        "scorecard_1": _copy_scorecard(match.innings_1.get_scorecard()) if match.innings_1 else {},
+        "scorecard_2": _copy_scorecard(match.innings_2.get_scorecard()) if match.innings_2 else {},
+    })
+
+
+def _save_history_sync(room_code: str, match: Match, potm_data: dict, tournament_id) -> bool:
     try:
-        sc1 = match.innings_1.get_scorecard() if match.innings_1 else {}
-        sc2 = match.innings_2.get_scorecard() if match.innings_2 else {}
-        super_over_timeline = match.get_super_over_timeline() if hasattr(match, "get_super_over_timeline") else []
-        potm_payload = dict(potm_data) if isinstance(potm_data, dict) else None
-
-        if match.is_super_over and potm_payload is not None:
-            latest_round = super_over_timeline[-1] if super_over_timeline else None
-            if latest_round:
-                potm_payload["super_over_data"] = {
-                    "scorecard_3": latest_round.get("scorecard_3") or {},
-                    "scorecard_4": latest_round.get("scorecard_4") or {},
-                    "bat_team_3": latest_round.get("bat_team_3") or match.bowling_first,
-                    "bat_team_4": latest_round.get("bat_team_4") or match.batting_first,
-                }
-            else:
-                potm_payload["super_over_data"] = {
-                    "scorecard_3": match.innings_3.get_scorecard() if getattr(match, "innings_3", None) else {},
-                    "scorecard_4": match.innings_4.get_scorecard() if getattr(match, "innings_4", None) else {},
-                    "bat_team_3": match.bowling_first,
-                    "bat_team_4": match.batting_first,
-                }
-
-        history = MatchHistory(
-            match_id=match.id,
-            room_code=room.code,
-            mode=match.mode,
-            side_a=json.dumps(match.side_a),
-            side_b=json.dumps(match.side_b),
-            scorecard_1=json.dumps(sc1),
-            scorecard_2=json.dumps(sc2),
-            result_text=match.result_text,
-            winner=match.winner,
-            potm=potm_payload.get("player") if potm_payload else None,
-            potm_stats=json.dumps(potm_payload) if potm_payload else None,
-            super_over_timeline=json.dumps(super_over_timeline) if super_over_timeline else None,
-            tournament_id=tournament_id,
-            end_timestamp=datetime.utcnow(),
-        )
-
-        db.add(history)
-        db.commit()
-
-        if tournament_id:
-            room.tournament_match_ids.append(match.id)
-            room.tournament_scorecards.append({
-                "scorecard_1": sc1,
-                "scorecard_2": sc2,
-            })
+        with session_scope() as db:
+            _write_match_history(db, room_code, match, potm_data, tournament_id)
+        return True
     except Exception as e:
         print(f"⚠ Error saving match history: {e}")
-        db.rollback()
-    finally:
-        db.close()
+        return False
+
+
+def _save_records_sync(room_code: str, match: Match, potm_data: dict, tournament_id) -> bool:
+    # Separate units of work, so a stats failure cannot cost the history row
+    try:
+        with session_scope() as db:
+            _write_match_stats(db, match)
+    except Exception as e:
+        print(f"⚠ Error saving match stats: {e}")
+    return _save_history_sync(room_code, match, potm_data, tournament_id)
+
+
+def _run_in_background(pending: set, fn, *args, on_saved=None) -> None:
+    """Run a blocking DB write in a worker thread so match-end broadcasts are not held up.
+
+    The task is held in *pending* until it finishes; on_saved runs on the
+    event loop once fn has returned True.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Fallback for non-async contexts.
+        if fn(*args) and on_saved:
+            on_saved()
+        return
+    task = loop.create_task(asyncio.to_thread(fn, *args))
+    pending.add(task)
+    task.add_done_callback(pending.discard)
+    if on_saved:
+        def _after_save(done: asyncio.Task) -> None:
+            if not done.cancelled() and done.exception() is None and done.result():
+                on_saved()
+        task.add_done_callback(_after_save)
+
+
+async def wait_for_pending_saves(room) -> None:
+    """Wait for the room's background match writes, including their on-loop bookkeeping."""
+    if room.pending_saves:
+        await asyncio.gather(*list(room.pending_saves), return_exceptions=True)
+
+
+def save_match_stats(manager, room, match: Match) -> None:
+    with session_scope() as db:
+        _write_match_stats(db, match)
+
+
+def save_match_history(manager, room, match: Match, potm_data: dict, tournament_id=None) -> None:
+    on_saved = partial(_record_tournament_match, room, match) if tournament_id else None
+    _run_in_background(room.pending_saves, _save_history_sync, room.code, match, potm_data, tournament_id, on_saved=on_saved)
+
+
+def save_match_records(manager, room, match: Match, potm_data: dict, tournament_id=None) -> None:
+    """Stats and history for a finished match, written in the background."""
+    # A tournament only counts the match once its history row is stored
+    on_saved = partial(_record_tournament_match, room, match) if tournament_id else None
+    _run_in_background(room.pending_saves, _save_records_sync, room.code, match, potm_data, tournament_id, on_saved=on_saved)
@@ -1,14 +1,14 @@
 import uuid
 from ...game.game_engine import Match
+from .. import cpu as cpu_logic
+from .actions.timeouts import _cancel_all_timeouts
 
 
 async def start_match(manager, room, player) -> None:
     if player.username != room.host:
         return
     if not room.host_plays:
-        for t in room.teams.values():
-            if room.host in t:
-                t.remove(room.host)
+        room.set_player_team(room.host, None)
         for team_key, captain in list(room.captains.items()):
             if captain == room.host:
                 room.captains[team_key] = None
@@ -18,8 +18,8 @@ async def start_match(manager, room, player) -> None:
     if room.mode == "team":
         active_humans = manager._active_humans(room)
         active_set = set(active_humans)
-        team_a = [p for p in room.teams.get("A", []) if p in active_set or p in room.cpu_names]
-        team_b = [p for p in room.teams.get("B", []) if p in active_set or p in room.cpu_names]
+        team_a = [p for p in room.teams.get("A", []) if p in active_set or p in room.cpu_name_set]
+        team_b = [p for p in room.teams.get("B", []) if p in active_set or p in room.cpu_name_set]
         total_players = len(active_humans) + (len(room.cpu_names) if room.cpu_enabled and not room.cpu_only else 0)
         assigned_total = len(team_a) + len(team_b)
         if assigned_total != total_players:
@@ -62,9 +62,7 @@ async def start_match(manager, room, player) -> None:
     )
     room.pending_moves = {}
     # Reset countdown state for a fresh match
-    room.auto_move_strikes = {}
-    for task in room.pending_timeouts.values():
-        if task and not task.done():
-            task.cancel()
-    room.pending_timeouts = {}
+    room.auto_move_strikes.clear()
+    _cancel_all_timeouts(room)
+    cpu_logic.set_cpu_autoplay_delay(room)
     await manager._initiate_toss(room)
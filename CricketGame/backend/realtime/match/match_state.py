@@ -1,6 +1,41 @@
-async def send_match_state(manager, room) -> None:
+import asyncio
+from typing import Dict, List, Optional
+
+from .actions.captain import _side_captains
+
+# CPU ready-indicator updates inside this window collapse into one MATCH_STATE
+STATE_BROADCAST_DELAY = 0.05
+
+
+def send_match_state_soon(manager, room) -> None:
+    """Schedule a single MATCH_STATE send for the room unless one is already pending."""
+    task = room._state_broadcast_task
+    if task is not None and not task.done():
+        return
+    room._state_broadcast_task = asyncio.create_task(_delayed_match_state(manager, room))
+
+
+async def _delayed_match_state(manager, room) -> None:
+    await asyncio.sleep(STATE_BROADCAST_DELAY)
+    room._state_broadcast_task = None
+    await manager._send_match_state(room)
+
+
+async def send_match_state(manager, room, batch_with: Optional[List[dict]] = None,
+                           follow_up: Optional[Dict[str, dict]] = None) -> None:
+    """
+    Send each player their MATCH_STATE view.
+    Messages in `batch_with` are delivered ahead of the state, and a player's
+    `follow_up` message right after it, in a single BATCH frame.
+    """
+    # This send carries the latest state, so a pending deferred one is redundant
+    task = room._state_broadcast_task
+    if task is not None:
+        room._state_broadcast_task = None
+        task.cancel()
     match = room.match
-    if not match:
+    # Headless (all-CPU, nobody connected) matches have no one to render state for
+    if not match or not room.players:
         return
     innings = match.active_innings
     if not innings:
@@ -8,17 +43,9 @@ async def send_match_state(manager, room) -> None:
 
     pending = room.pending_moves
 
-    # Determine which team is batting/bowling to find captains
-    batting_team = None
-    bowling_team = None
-    for team_key, members in room.teams.items():
-        if innings.batting_side and innings.batting_side[0] in members:
-            batting_team = team_key
-        elif innings.bowling_side and innings.bowling_side[0] in members:
-            bowling_team = team_key
-    batting_captain = room.captains.get(batting_team) if batting_team else None
-    bowling_captain = room.captains.get(bowling_team) if bowling_team else None
+    batting_captain, bowling_captain = _side_captains(room, innings)
 
+    scorecard = innings.get_scorecard()
     base_state = {
         "type": "MATCH_STATE",
         "mode": match.mode,
@@ -33,42 +60,62 @@ async def send_match_state(manager, room) -> None:
         "overs": innings.overs_display,
         "total_overs": innings.total_overs,
         "target": innings.target,
-        "batting_card": [innings.batting_cards[n].to_dict() for n in innings.batting_side],
-        "bowling_card": [innings.bowling_cards[n].to_dict() for n in innings.bowling_side],
+        # Same lists as the memoized scorecard; rebuilt only after a ball
+        "batting_card": scorecard["batting"],
+        "bowling_card": scorecard["bowling"],
         "bat_ready": "bat" in pending,
         "bowl_ready": "bowl" in pending,
         # Captain selection state
         "needs_batter_choice": innings.needs_batter_choice,
         "needs_bowler_choice": innings.needs_bowler_choice,
-        "available_batters": innings.available_next_batters() if innings.needs_batter_choice else [],
-        "available_bowlers": innings.available_next_bowlers() if innings.needs_bowler_choice else [],
+        "available_batters": innings.batter_pick_options().options if innings.needs_batter_choice else [],
+        "available_bowlers": innings.bowler_pick_options().options if innings.needs_bowler_choice else [],
         "batting_captain": batting_captain,
         "bowling_captain": bowling_captain,
     }
     if room.tournament and match.mode == "tournament":
         base_state["tournament"] = manager._build_tournament_payload(room.tournament, skip_current=True)
 
-
-
+    # Only my_role differs between players, so encode each role's view once
+    encoded: Dict[str, str] = {}
+    needs_pick = innings.needs_batter_choice or innings.needs_bowler_choice
+    batting_set = frozenset(innings.batting_side)
+    bowling_set = frozenset(innings.bowling_side)
+    sends = []
     for username, p in room.players.items():
-        state = dict(base_state)
-        if innings.needs_batter_choice or innings.needs_bowler_choice:
+        if p.closed:
+            continue
+        if needs_pick:
             # During captain selection, active role is "captain" — not regular batting/bowling
             if innings.needs_batter_choice and username == batting_captain:
-                state["my_role"] = "BATTING_CAPTAIN_PICK"
+                role = "BATTING_CAPTAIN_PICK"
             elif innings.needs_bowler_choice and username == bowling_captain:
-                state["my_role"] = "BOWLING_CAPTAIN_PICK"
+                role = "BOWLING_CAPTAIN_PICK"
             else:
-                state["my_role"] = "WAITING"
+                role = "WAITING"
         elif username == innings.striker:
-            state["my_role"] = "BATTING"
+            role = "BATTING"
         elif username == innings.current_bowler:
-            state["my_role"] = "BOWLING"
-        elif username in innings.batting_side:
-            state["my_role"] = "NON_STRIKER"
-        elif username in innings.bowling_side:
-            state["my_role"] = "FIELDING"
+            role = "BOWLING"
+        elif username in batting_set:
+            role = "NON_STRIKER"
+        elif username in bowling_set:
+            role = "FIELDING"
         else:
-            state["my_role"] = "SPECTATING"
-        await manager.send(p, state)
-
+            role = "SPECTATING"
+        extra = follow_up.get(username) if follow_up else None
+        if extra:
+            # Per-player follow-up messages make this frame unique
+            items = [*batch_with] if batch_with else []
+            items += [{**base_state, "my_role": role}, extra]
+            sends.append(manager.send(p, {"type": "BATCH", "items": items}))
+            continue
+        text = encoded.get(role)
+        if text is None:
+            state = {**base_state, "my_role": role}
+            msg = {"type": "BATCH", "items": [*batch_with, state]} if batch_with else state
+            text = encoded[role] = manager.encode(msg)
+        # Bare state snapshots are superseded by the next one and may be dropped
+        sends.append(manager.send_encoded(p, text, droppable=not batch_with))
+    # Deliver concurrently so one slow socket does not hold up the rest
+    await asyncio.gather(*sends)
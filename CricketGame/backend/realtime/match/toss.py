@@ -1,5 +1,7 @@
 import asyncio
 
+from .actions.timeouts import _start_delayed_timeout
+
 CPU_PICK_TIMEOUT = 30
 
 
@@ -14,7 +16,7 @@ def _human_captain_for_cpu(manager, room, cpu_player: str):
 
 
 async def _cpu_call_timeout(manager, room, caller: str) -> None:
-    await asyncio.sleep(CPU_PICK_TIMEOUT)
+    """Fallback CPU toss call, fired CPU_PICK_TIMEOUT after the toss opens."""
     match = room.match
     if not match:
         return
@@ -27,7 +29,7 @@ async def _cpu_call_timeout(manager, room, caller: str) -> None:
 
 
 async def _cpu_choice_timeout(manager, room, winner: str) -> None:
-    await asyncio.sleep(CPU_PICK_TIMEOUT)
+    """Fallback CPU bat/bowl choice, fired CPU_PICK_TIMEOUT after the toss result."""
     match = room.match
     if not match or match.toss_choice is not None:
         return
@@ -46,8 +48,7 @@ async def initiate_toss(manager, room) -> None:
     if room.mode == "team" and room.captains:
         captains = [c for c in room.captains.values() if c]
         if captains:
-            import random
-            caller = random.choice(captains)
+            caller = room.rng.choice(captains)
 
     toss_info = match.do_toss(caller)
     caller = toss_info["caller"]
@@ -65,7 +66,7 @@ async def initiate_toss(manager, room) -> None:
             await manager.send(p, {"type": "TOSS_WAITING", "caller": toss_caller, **match_info})
         await asyncio.sleep(0.3)
         await manager._cpu_call_toss(room)
-        asyncio.create_task(_cpu_call_timeout(manager, room, caller))
+        _start_delayed_timeout(room, "toss", CPU_PICK_TIMEOUT, _cpu_call_timeout, manager, room, caller)
         return
 
     for username, p in room.players.items():
@@ -112,7 +113,7 @@ async def toss_call(manager, room, player, msg: dict) -> None:
             chooser = human_captain
     if room.cpu_enabled and manager._is_cpu(room, winner) and not human_captain:
         await manager._cpu_choose_toss(room)
-        asyncio.create_task(_cpu_choice_timeout(manager, room, winner))
+        _start_delayed_timeout(room, "toss", CPU_PICK_TIMEOUT, _cpu_choice_timeout, manager, room, winner)
         return
     winner_conn = room.players.get(chooser)
     if winner_conn:
@@ -134,7 +135,7 @@ async def toss_choice(manager, room, player, msg: dict) -> None:
         return
     if room.cpu_enabled and manager._is_cpu(room, toss_winner) and not human_captain:
         await manager._cpu_choose_toss(room)
-        asyncio.create_task(_cpu_choice_timeout(manager, room, toss_winner))
+        _start_delayed_timeout(room, "toss", CPU_PICK_TIMEOUT, _cpu_choice_timeout, manager, room, toss_winner)
         return
 
     choice = msg.get("choice", "bat")
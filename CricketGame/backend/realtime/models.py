@@ -1,5 +1,6 @@
 import random
 import string
+from collections import deque
 from typing import Dict, Optional, List, Any
 
 from fastapi import WebSocket
@@ -7,21 +8,54 @@ from ..game.game_engine import Match
 from ..game.tournament import Tournament
 
 
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
+# OS entropy so concurrent rooms cannot predict each other's codes
+_code_rng = random.SystemRandom()
+
+
 def gen_room_code() -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    return "".join(_code_rng.choices(_CODE_ALPHABET, k=6))
+
+
+# Opponent moves a CPU remembers; the simple picker only reads this many
+CPU_HISTORY_WINDOW = 12
+
+
+def new_cpu_history() -> Dict[str, deque]:
+    return {"bat": deque(maxlen=CPU_HISTORY_WINDOW), "bowl": deque(maxlen=CPU_HISTORY_WINDOW)}
 
 
 class PlayerConn:
     """A single authenticated WebSocket connection."""
+    __slots__ = ("ws", "username", "team", "is_captain", "pending_bytes", "high_water", "deferred_state", "closed")
+
     def __init__(self, ws: WebSocket, username: str):
         self.ws = ws
         self.username = username
         self.team: Optional[str] = None
         self.is_captain = False
+        # Bytes handed to the socket but not yet flushed; MATCH_STATE is held back above high_water
+        self.pending_bytes = 0
+        self.high_water = 1 << 20
+        # Latest held-back MATCH_STATE text, sent once the backlog drains
+        self.deferred_state: Optional[str] = None
+        # Set after a failed send; the receive loop removes the connection shortly after
+        self.closed = False
 
 
 class Room:
     """A game room with lobby, settings, and active match state."""
+    __slots__ = (
+        "code", "host", "players", "mode", "overs", "wickets", "host_plays", "rng",
+        "teams", "player_team", "_lobby_payload", "_lobby_broadcast_task", "team_names", "captains",
+        "match", "pending_moves", "toss_state",
+        "cpu_enabled", "cpu_only", "_cpu_names", "cpu_name_set", "cpu_history",
+        "cpu_autoplay", "cpu_autoplay_delay", "user_ids", "ball_log_buffer",
+        "tournament", "tournament_id", "tournament_match_ids", "tournament_scorecards",
+        "auto_move_strikes", "pending_timeouts", "_state_broadcast_task", "cpu_context", "_side_teams",
+        "pending_saves",
+    )
+
     def __init__(self, code: str, host: str):
         self.code = code
         self.host = host
@@ -31,8 +65,16 @@ class Room:
         self.overs = 2
         self.wickets = 1
         self.host_plays = True
+        # Room-local RNG for CPU picks, auto-moves and tie-breaks; seed it to replay a match
+        self.rng = random.Random()
 
         self.teams: Dict[str, List[str]] = {"A": [], "B": []}
+        # Player -> team key index over self.teams; change membership via set_player_team
+        self.player_team: Dict[str, str] = {}
+        # Reused LOBBY_UPDATE message; RoomManager.broadcast_lobby refreshes the changing fields
+        self._lobby_payload: Dict[str, Any] = {"type": "LOBBY_UPDATE", "host": host, "room_code": code}
+        # Pending debounced LOBBY_UPDATE broadcast, see lobby._broadcast_lobby_soon
+        self._lobby_broadcast_task: Optional[Any] = None
         self.team_names: Dict[str, str] = {"A": "Team A", "B": "Team B"}
         self.captains: Dict[str, Optional[str]] = {"A": None, "B": None}
 
@@ -41,9 +83,14 @@ class Room:
         self.toss_state: Dict[str, Any] = {}
         self.cpu_enabled = False
         self.cpu_only = False
-        self.cpu_names: List[str] = []
-        self.cpu_history: Dict[str, Dict[str, List[int]]] = {}
+        self.cpu_names: List[str] = []   # ordered; mirrored in cpu_name_set for lookups
+        self.cpu_history: Dict[str, Dict[str, deque]] = {}
         self.cpu_autoplay = False
+        self.cpu_autoplay_delay = 0.25
+        # Opponent username -> user id (-1 if unknown) for CPU strategy lookups
+        self.user_ids: Dict[str, int] = {}
+        # Learning-log payloads waiting to be written in one batch
+        self.ball_log_buffer: List[dict] = []
 
         self.tournament: Optional[Tournament] = None
         self.tournament_id: Optional[str] = None
@@ -53,33 +100,92 @@ class Room:
         # Captain selection & countdown state
         # Tracks how many times CPU auto-played for a human player this innings
         self.auto_move_strikes: Dict[str, int] = {}
-        # Holds running asyncio timeout Tasks keyed by "bat", "bowl", or "captain"
+        # Pending timeouts (Tasks or TimerHandles) keyed by "bat", "bowl", "captain" or "toss"
         self.pending_timeouts: Dict[str, Any] = {}
+        # Pending coalesced MATCH_STATE send, see match_state.send_match_state_soon
+        self._state_broadcast_task: Optional[Any] = None
+        # Background match DB writes still running; also keeps their tasks referenced
+        self.pending_saves: set = set()
+        # (innings, fixed strategy-context fields) for CPU picks, rebuilt when the innings changes
+        self.cpu_context: Optional[tuple] = None
+        # (innings, batting team, bowling team); dropped on any team membership change
+        self._side_teams: Optional[tuple] = None
+
+    @property
+    def cpu_names(self) -> List[str]:
+        return self._cpu_names
+
+    @cpu_names.setter
+    def cpu_names(self, names: List[str]) -> None:
+        self._cpu_names = list(names)
+        self.cpu_name_set = set(self._cpu_names)
+
+    def add_cpu_name(self, name: str) -> None:
+        self._cpu_names.append(name)
+        self.cpu_name_set.add(name)
+
+    def pop_cpu_name(self) -> str:
+        name = self._cpu_names.pop()
+        self.cpu_name_set.discard(name)
+        return name
+
+    def set_player_team(self, username: str, team: Optional[str]) -> None:
+        """Move a player onto `team`, or off every team when `team` is None."""
+        self._side_teams = None
+        old = self.player_team.pop(username, None)
+        if old is not None:
+            self.teams[old].remove(username)
+        if team is not None:
+            self.teams[team].append(username)
+            self.player_team[username] = team
+
+    def clear_teams(self) -> None:
+        self.teams = {"A": [], "B": []}
+        self.player_team = {}
+        self._side_teams = None
+
+    def team_for_side(self, side: List[str]) -> Optional[str]:
+        """Return the team key whose member list overlaps with *side*."""
+        for p in side:
+            key = self.player_team.get(p)
+            if key:
+                return key
+        return None
+
+    def side_teams(self, innings) -> tuple:
+        """(batting team, bowling team) keys for *innings*, cached until membership changes."""
+        cached = self._side_teams
+        if cached is None or cached[0] is not innings:
+            cached = self._side_teams = (
+                innings,
+                self.team_for_side(innings.batting_side),
+                self.team_for_side(innings.bowling_side),
+            )
+        return cached[1], cached[2]
 
     @property
     def player_list(self) -> List[dict]:
+        # Room-wide flags are the same for every entry; work them out once
+        in_match = self.match is not None and not self.match.is_finished
         players = [
             {
                 "username": p.username,
                 "team": p.team,
                 "is_captain": p.is_captain,
-                "in_match": self.match is not None and not self.match.is_finished,
+                "in_match": in_match,
             }
             for p in self.players.values()
             if self.host_plays or p.username != self.host
         ]
         if self.cpu_enabled:
-            for cpu_name in self.cpu_names:
-                cpu_team = None
-                if cpu_name in self.teams.get("A", []):
-                    cpu_team = "A"
-                elif cpu_name in self.teams.get("B", []):
-                    cpu_team = "B"
-                cpu_is_captain = self.captains.get("A") == cpu_name or self.captains.get("B") == cpu_name
-                players.append({
+            captains = set(self.captains.values())
+            players.extend(
+                {
                     "username": cpu_name,
-                    "team": cpu_team,
-                    "is_captain": cpu_is_captain,
-                    "in_match": self.match is not None and not self.match.is_finished,
-                })
+                    "team": self.player_team.get(cpu_name),
+                    "is_captain": cpu_name in captains,
+                    "in_match": in_match,
+                }
+                for cpu_name in self.cpu_names
+            )
         return players
@@ -1,31 +1,33 @@
-import json
-import random
 import uuid
 
-from ..data.database import SessionLocal
-from ..data.models import TournamentHistory
+from sqlalchemy import select, update
+
+from ..data.database import session_scope
+from ..data.models import FormatStats, Player, TournamentHistory, dump_json
 from ..game.game_engine import Match, compute_tournament_awards
 from ..game.tournament import Tournament
+from .cpu import set_cpu_autoplay_delay
+from .match.actions.timeouts import _cancel_all_timeouts
+from .match.match_persistence import wait_for_pending_saves
+
+
+def _bump_tournament_stat(db, usernames: list, column: str) -> None:
+    """Add one to a tournament FormatStats counter for every listed player, in one UPDATE."""
+    counter = getattr(FormatStats, column)
+    db.execute(
+        update(FormatStats)
+        .where(
+            FormatStats.format == "tournament",
+            FormatStats.player_id.in_(select(Player.id).where(Player.username.in_(usernames))),
+        )
+        .values({column: counter + 1})
+        .execution_options(synchronize_session=False)
+    )
 
 
 def build_tournament_payload(tournament: Tournament, skip_current: bool) -> dict:
-    upcoming = []
-    if tournament.phase == Tournament.PHASE_GROUP:
-        start = tournament.current_group_match_idx + (1 if skip_current else 0)
-        remaining = tournament.group_matches[start:]
-        upcoming = [{"label": "group", "teams": [a, b]} for a, b in remaining]
-    else:
-        phases = [Tournament.PHASE_Q1, Tournament.PHASE_ELIM, Tournament.PHASE_Q2, Tournament.PHASE_FINAL]
-        for key in phases:
-            pair = tournament.playoff_matches.get(key)
-            teams = list(pair) if pair else []
-            upcoming.append({"label": key, "teams": teams})
-    return {
-        "standings": tournament.get_sorted_standings(),
-        "phase": tournament.phase,
-        "info": tournament.to_dict(),
-        "upcoming_matches": upcoming,
-    }
+    # Sent with every MATCH_STATE; the tournament caches it until a result is recorded
+    return tournament.payload(skip_current)
 
 
 async def start_tournament(manager, room, player) -> None:
@@ -46,21 +48,8 @@ async def start_tournament(manager, room, player) -> None:
     room.tournament_match_ids = []
     room.tournament_scorecards = []
 
-    db = SessionLocal()
-    try:
-        from ..data.models import FormatStats, Player
-        for u in usernames:
-            player = db.query(Player).filter(Player.username == u).first()
-            if player:
-                fs = db.query(FormatStats).filter(
-                    FormatStats.player_id == player.id,
-                    FormatStats.format == "tournament"
-                ).first()
-                if fs:
-                    fs.tournaments_played += 1
-        db.commit()
-    finally:
-        db.close()
+    with session_scope() as db:
+        _bump_tournament_stat(db, usernames, "tournaments_played")
 
     await manager.broadcast(room, {
         "type": "TOURNAMENT_STANDINGS",
@@ -88,27 +77,16 @@ async def start_next_tournament_match(manager, room) -> None:
             })
             await manager._create_tournament_match(room, pair[0], pair[1])
     elif t.phase == Tournament.PHASE_COMPLETE:
+        # The final's scorecards are recorded once its history write lands
+        await wait_for_pending_saves(room)
         awards = compute_tournament_awards(room.tournament_scorecards)
 
-        db = SessionLocal()
         try:
-            from ..data.models import FormatStats, Player
             if t.champion:
-                player = db.query(Player).filter(Player.username == t.champion).first()
-                if player:
-                    fs = db.query(FormatStats).filter(
-                        FormatStats.player_id == player.id,
-                        FormatStats.format == "tournament"
-                    ).first()
-                    if fs:
-                        fs.tournaments_won += 1
-
-            db.commit()
+                with session_scope() as db:
+                    _bump_tournament_stat(db, [t.champion], "tournaments_won")
         except Exception as e:
             print(f"Error updating tournament stats: {e}")
-            db.rollback()
-        finally:
-            db.close()
 
         await manager.broadcast(room, {
             "type": "TOURNAMENT_OVER",
@@ -136,11 +114,9 @@ async def create_tournament_match(manager, room, p1: str, p2: str) -> None:
     )
     room.pending_moves = {}
     # Reset countdown state for a fresh tournament match (prevents carryover)
-    room.auto_move_strikes = {}
-    for task in room.pending_timeouts.values():
-        if task and not task.done():
-            task.cancel()
-    room.pending_timeouts = {}
+    room.auto_move_strikes.clear()
+    _cancel_all_timeouts(room)
+    set_cpu_autoplay_delay(room)
     await manager._initiate_toss(room)
 
 
@@ -151,14 +127,14 @@ def apply_tournament_result(manager, room, match: Match) -> dict:
     winner = match.winner
     nrr = match.get_nrr_data()
     p1, p2 = match.side_a[0], match.side_b[0]
-    nrr_locked = bool(getattr(match, "nrr_locked", False))
+    nrr_locked = match.nrr_locked
 
     if t.phase == Tournament.PHASE_GROUP:
         group_winner = None if winner == "TIE" else winner
         t.record_group_result(p1, p2, group_winner, nrr, update_nrr=not nrr_locked)
     else:
         if winner in (None, "TIE"):
-            winner = random.choice([p1, p2])
+            winner = room.rng.choice([p1, p2])
         loser = p2 if winner == p1 else p1
         t.record_playoff_result(winner, loser)
 
@@ -179,7 +155,7 @@ def apply_tournament_cancellation(manager, room, match: Match) -> dict:
             "runs_scored_2": 0, "overs_faced_2": 0
         })
     else:
-        winner = random.choice([p1, p2])
+        winner = room.rng.choice([p1, p2])
         loser = p2 if winner == p1 else p1
         t.record_playoff_result(winner, loser)
 
@@ -187,31 +163,27 @@ def apply_tournament_cancellation(manager, room, match: Match) -> dict:
 
 
 def save_tournament_history(manager, room, t: Tournament, awards: dict) -> None:
-    db = SessionLocal()
     try:
         history = TournamentHistory(
             tournament_id=room.tournament_id,
             room_code=room.code,
-            players=json.dumps(t.players),
-            standings=json.dumps(t.get_sorted_standings()),
-            playoff_bracket=json.dumps({
+            players=dump_json(t.players),
+            standings=dump_json(t.get_sorted_standings()),
+            playoff_bracket=dump_json({
                 k: list(v) if v else None
                 for k, v in t.playoff_matches.items()
             }),
-            playoff_results=json.dumps(t.playoff_results),
-            match_ids=json.dumps(room.tournament_match_ids),
+            playoff_results=dump_json(t.playoff_results),
+            match_ids=dump_json(room.tournament_match_ids),
             champion=t.champion,
-            orange_cap=json.dumps(awards.get("orange_cap")),
-            purple_cap=json.dumps(awards.get("purple_cap")),
-            best_strike_rate=json.dumps(awards.get("best_strike_rate")),
-            best_average=json.dumps(awards.get("best_average")),
-            best_economy=json.dumps(awards.get("best_economy")),
-            player_of_tournament=json.dumps(awards.get("player_of_tournament")),
+            orange_cap=dump_json(awards.get("orange_cap")),
+            purple_cap=dump_json(awards.get("purple_cap")),
+            best_strike_rate=dump_json(awards.get("best_strike_rate")),
+            best_average=dump_json(awards.get("best_average")),
+            best_economy=dump_json(awards.get("best_economy")),
+            player_of_tournament=dump_json(awards.get("player_of_tournament")),
         )
-        db.add(history)
-        db.commit()
+        with session_scope() as db:
+            db.add(history)
     except Exception as e:
         print(f"⚠ Error saving tournament history: {e}")
-        db.rollback()
-    finally:
-        db.close()
@@ -1,25 +1,26 @@
+import pytest
 from fastapi.testclient import TestClient
 from backend.main import app
 from backend.core.config import ADMIN_SECRET
-from backend.data.database import init_db
 
-# Initialize DB for tests
-init_db()
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client(db_schema):
+    # Schema only; entering the app lifespan would also start the learning processor
+    return TestClient(app)
 
-def test_migrate_formats_no_header():
+def test_migrate_formats_no_header(client):
     # Expect 422 because the header is required (Header(...))
     response = client.get("/auth/migrate-formats")
     assert response.status_code == 422
 
-def test_migrate_formats_wrong_header():
+def test_migrate_formats_wrong_header(client):
     # Expect 403 because the secret is invalid
     response = client.get("/auth/migrate-formats", headers={"X-Admin-Secret": "wrong-secret"})
     assert response.status_code == 403
     assert response.json()["detail"] == "Invalid admin secret"
 
-def test_migrate_formats_correct_header():
+def test_migrate_formats_correct_header(client):
     # Expect 200 because the secret matches
     response = client.get("/auth/migrate-formats", headers={"X-Admin-Secret": ADMIN_SECRET})
     assert response.status_code == 200
@@ -0,0 +1,130 @@
+"""
+Test script for CPU context detection helpers
+Pure functions only; no database is opened.
+"""
+import pytest
+
+from .cpu.cpu_learning_utils import (
+    get_game_phase, get_score_situation, get_recent_event,
+    calculate_learning_phase, normalize_frequencies
+)
+
+
+GAME_PHASE_CASES = [
+    (0, 10, 'powerplay'),
+    (5, 10, 'middle'),
+    (9, 10, 'death'),
+]
+
+RECENT_EVENT_CASES = [
+    ([], 'normal'),
+    ([{'runs': 4, 'is_out': False}, {'runs': 6, 'is_out': False}, {'runs': 4, 'is_out': False}], 'hot_streak'),
+    ([{'runs': 2, 'is_out': False}, {'runs': 3, 'is_out': True}], 'just_out'),
+    ([{'runs': 1, 'is_out': False}, {'runs': 6, 'is_out': False}], 'hit_six'),
+    ([{'runs': 0, 'is_out': False}], 'dot_ball'),
+]
+
+LEARNING_PHASE_CASES = [
+    (50, 'global', 0.0, 0.3),
+    (150, 'transition', 0.3, 0.7),
+    (500, 'personalized', 0.7, 0.95),
+]
+
+NORMALIZE_CASES = [
+    [1, 2, 3, 4, 5, 6, 7],
+    [0, 0, 0, 0, 0, 0, 1],
+    [0.5, 0.25, 0.125, 0.0625, 0.03125, 0.015625, 0.015625],
+    [0, 0, 0, 0, 0, 0, 0],
+]
+
+
+@pytest.mark.parametrize("over,total,phase", GAME_PHASE_CASES)
+def test_game_phase(over, total, phase):
+    assert get_game_phase(over, total) == phase
+    print(f"  ✓ get_game_phase({over}, {total}): {phase}")
+
+
+def test_score_situation():
+    """Test score pressure buckets for both innings."""
+    print("\n🧪 Testing Score Situation...")
+    
+    # Test score situation (batting first)
+    situation = get_score_situation(
+        batting_first=True,
+        current_score=50,
+        target=None,
+        wickets_lost=2,
+        balls_left=30,
+        total_overs=10
+    )
+    assert situation in ['defending_safe', 'defending_comfortable', 'defending_moderate', 'defending_tight', 'defending_collapse']
+    print(f"  ✓ get_score_situation (batting first): {situation}")
+    
+    # Test score situation (chasing)
+    situation = get_score_situation(
+        batting_first=False,
+        current_score=30,
+        target=51,
+        wickets_lost=3,
+        balls_left=20,
+        total_overs=10
+    )
+    assert situation in ['chasing_comfortable', 'chasing_moderate', 'chasing_tight', 'chasing_desperate', 'chasing_very_tight', 'chasing_won']
+    print(f"  ✓ get_score_situation (chasing): {situation}")
+
+
+@pytest.mark.parametrize("results,event", RECENT_EVENT_CASES)
+def test_recent_event(results, event):
+    assert get_recent_event(results) == event
+    print(f"  ✓ get_recent_event: {event}")
+
+
+@pytest.mark.parametrize("balls,expected_phase,low,high", LEARNING_PHASE_CASES)
+def test_learning_phase(balls, expected_phase, low, high):
+    phase, confidence = calculate_learning_phase(balls)
+    assert phase == expected_phase
+    assert low <= confidence <= high
+    print(f"  ✓ calculate_learning_phase ({balls} balls): {phase}, confidence={confidence}")
+
+
+@pytest.mark.parametrize("freqs", NORMALIZE_CASES)
+def test_normalize_frequencies(freqs):
+    normalized = normalize_frequencies(freqs)
+    assert len(normalized) == 7
+    assert abs(sum(normalized) - 1.0) < 1e-9
+    assert all(f >= 0 for f in normalized)
+    print(f"  ✓ normalize_frequencies: sum={sum(normalized)}")
+
+
+def run_all_tests():
+    """Run all tests."""
+    print("=" * 60)
+    print("CPU CONTEXT FUNCTIONS TEST SUITE")
+    print("=" * 60)
+
+    try:
+        print("\n🧪 Testing Context Detection Functions...")
+        for case in GAME_PHASE_CASES:
+            test_game_phase(*case)
+        test_score_situation()
+        for case in RECENT_EVENT_CASES:
+            test_recent_event(*case)
+        for case in LEARNING_PHASE_CASES:
+            test_learning_phase(*case)
+        for freqs in NORMALIZE_CASES:
+            test_normalize_frequencies(freqs)
+
+        print("\n" + "=" * 60)
+        print("✅ ALL TESTS PASSED")
+        print("=" * 60)
+
+    except Exception as e:
+        print("\n" + "=" * 60)
+        print(f"❌ TEST FAILED: {e}")
+        print("=" * 60)
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -1,12 +1,32 @@
 import asyncio
+from functools import partial
+from math import isclose
+from unittest.mock import MagicMock
+
+import pytest
 
 from .game.game_engine import Innings, Match, compute_potm, compute_tournament_awards
+from .game.tournament import StandingsEntry, Tournament
+from .realtime.manager import RoomManager
 from .realtime.models import Room, PlayerConn
+from .realtime.tournament import build_tournament_payload
+from .realtime.lobby import assign_team, set_captain
 from .realtime.match.match_start import start_match
 from .realtime.match.match_actions import resolve_pending_ball
+from .realtime.match.actions.ball import _next_innings_transition
+from .realtime.match.actions.captain import _side_captains, _start_captain_batter_pick
+from .realtime.match.actions.timeouts import _cancel_timeout, _start_delayed_timeout, _timeout_running
 from .realtime.match import toss as toss_module
 
 
+def _mock_manager():
+    """RoomManager double: async methods are awaitable mocks, room lookups stay real."""
+    manager = MagicMock(spec=RoomManager)
+    for name in ("_is_cpu", "_team_for_player", "_active_humans"):
+        getattr(manager, name).side_effect = partial(getattr(RoomManager, name), manager)
+    return manager
+
+
 def test_innings_resolution():
     innings = Innings(["A", "B"], ["C", "D"], total_overs=1, total_wickets=1)
     result = innings.resolve_ball(1, 2)
@@ -15,13 +35,67 @@ def test_innings_resolution():
     result = innings.resolve_ball(3, 3)
     assert result["is_out"] is True
     assert result["innings_complete"] is True
-
-
-def test_match_flow_and_potm():
-    match = Match("M1", "quick", ["A", "B"], ["C", "D"], total_overs=1, total_wickets=1)
+    assert innings.get_scorecard() is innings.get_scorecard()
+    idle_card = innings.bowling_cards["D"].to_dict()
+    assert innings.batting_cards["B"].to_dict()["is_out"] is True
+    assert innings.get_scorecard()["bowling"][1] is idle_card
+
+
+def test_super_over_snapshot_detached_from_card_cache():
+    match = Match("M7", "quick", ["A"], ["B"], total_overs=1, total_wickets=1)
+    match.innings_3 = Innings(["B"], ["A"], total_overs=1, total_wickets=1)
+    match.innings_4 = Innings(["A"], ["B"], total_overs=1, total_wickets=1)
+    match.innings_3.resolve_ball(4, 1)
+    snapshot = match.snapshot_super_over_round()
+    snapshot["scorecard_3"]["batting"][0]["runs"] = 99
+    assert match.innings_3.batting_cards["B"].to_dict()["runs"] == 4
+
+
+def test_hat_trick_detection():
+    innings = Innings(["A", "B", "C", "D"], ["E"], total_overs=2, total_wickets=4)
+    assert innings.resolve_ball(1, 1)["hat_trick"] is False
+    assert innings.resolve_ball(2, 2)["hat_trick"] is False
+    assert innings.resolve_ball(3, 3)["hat_trick"] is True
+
+    innings = Innings(["A", "B", "C", "D"], ["E"], total_overs=2, total_wickets=4)
+    innings.resolve_ball(1, 1)
+    innings.resolve_ball(2, 2)
+    innings.resolve_ball(4, 1)
+    assert innings.resolve_ball(3, 3)["hat_trick"] is False
+
+
+def test_captain_pick_options_follow_innings_state():
+    innings = Innings(["A", "B", "C"], ["D", "E"], total_overs=2, total_wickets=3, is_team_mode=True)
+    innings.apply_batter_choice("A")
+    innings.apply_bowler_choice("D")
+    innings.resolve_ball(2, 2)
+    picks = innings.batter_pick_options()
+    assert picks is innings.batter_pick_options()
+    assert picks.valid_names == {"C"}
+    assert picks.first_choice == "C"
+
+    innings.apply_batter_choice("C")
+    assert innings.batter_pick_options() is not picks
+
+    for _ in range(5):
+        innings.resolve_ball(1, 2)
+    bowlers = innings.bowler_pick_options()
+    assert innings.needs_bowler_choice
+    assert bowlers.valid_names == {"E"}
+    assert bowlers.first_choice == "E"
+
+
+def _seeded_match(match_id):
+    """Quick 2v2 match with A's side batting and innings 1 started."""
+    match = Match(match_id, "quick", ["A", "B"], ["C", "D"], total_overs=1, total_wickets=1)
     match.toss_winner = "A"
     match.apply_toss_choice("bat")
     match.start_innings_1()
+    return match
+
+
+def test_match_flow_and_potm():
+    match = _seeded_match("M1")
     match.innings_1.resolve_ball(0, 0)
     match.start_innings_2()
     match.innings_2.resolve_ball(1, 2)
@@ -32,10 +106,7 @@ def test_match_flow_and_potm():
 
 
 def test_tournament_awards():
-    match = Match("M2", "quick", ["A", "B"], ["C", "D"], total_overs=1, total_wickets=1)
-    match.toss_winner = "A"
-    match.apply_toss_choice("bat")
-    match.start_innings_1()
+    match = _seeded_match("M2")
     match.innings_1.resolve_ball(2, 3)
     match.start_innings_2()
     match.innings_2.resolve_ball(1, 2)
@@ -45,34 +116,74 @@ def test_tournament_awards():
     assert "purple_cap" in awards
 
 
+def test_round_robin_schedule_covers_every_pair():
+    for n in (4, 5, 6):
+        players = [f"P{i}" for i in range(n)]
+        t = Tournament(players, overs=1, wickets=1)
+        pairs = {frozenset(p) for p in t.group_matches}
+        assert len(t.group_matches) == n * (n - 1) // 2
+        assert len(pairs) == len(t.group_matches)
+
+
+def test_round_robin_schedule_rests_players_between_matches():
+    for n in (5, 6):
+        players = [f"P{i}" for i in range(n)]
+        schedule = Tournament(players, overs=1, wickets=1).group_matches
+        for prev, nxt in zip(schedule, schedule[1:]):
+            assert set(prev).isdisjoint(nxt), (n, prev, nxt)
+
+
+NRR_CASES = [
+    (0, 0.0, 0, 0.0, 0.0),
+    (100, 10.0, 50, 10.0, 5.0),
+    (50, 10.0, 100, 10.0, -5.0),
+    (100, 10.5, 0, 0.0, 100 / 10.5),
+    (0, 0.0, 30, 5.0, -6.0),
+]
+
+
+@pytest.mark.parametrize("scored,faced,conceded,bowled,expected", NRR_CASES)
+def test_standings_entry_nrr(scored, faced, conceded, bowled, expected):
+    entry = StandingsEntry("X")
+    entry.runs_scored, entry.overs_faced = scored, faced
+    entry.runs_conceded, entry.overs_bowled = conceded, bowled
+    entry.update_nrr()
+    assert isclose(entry.nrr, expected, abs_tol=1e-4)
+
+
+def test_group_result_updates_nrr():
+    t = Tournament(["A", "B", "C", "D"], overs=2, wickets=1)
+    before = build_tournament_payload(t, skip_current=False)
+    assert build_tournament_payload(t, skip_current=False) is before
+    t.record_group_result("A", "B", "A", {
+        "runs_scored_1": 24, "overs_faced_1": 2.0,
+        "runs_scored_2": 12, "overs_faced_2": 2.0,
+        "batting_first_player": "A",
+    })
+    assert isclose(t.standings["A"].nrr, 6.0, abs_tol=1e-4)
+    assert isclose(t.standings["B"].nrr, -6.0, abs_tol=1e-4)
+    assert t.get_sorted_standings()[0]["player"] == "A"
+    assert t.get_sorted_standings() is t.get_sorted_standings()
+    after = build_tournament_payload(t, skip_current=False)
+    assert after is not before
+    assert after["info"]["group_matches_played"] == 1
+
+
 def test_host_opt_out_excludes_from_lobby_and_match_start():
     room = Room("ROOM1", "Host")
     room.players["Host"] = PlayerConn(None, "Host")
     room.players["Alice"] = PlayerConn(None, "Alice")
     room.players["Host"].team = "A"
     room.players["Host"].is_captain = True
-    room.teams["A"] = ["Host"]
-    room.teams["B"] = ["Alice"]
+    room.set_player_team("Host", "A")
+    room.set_player_team("Alice", "B")
     room.captains["A"] = "Host"
     room.captains["B"] = "Alice"
     room.host_plays = False
 
     assert all(p["username"] != "Host" for p in room.player_list)
 
-    class DummyManager:
-        def __init__(self):
-            self.sent = []
-
-        async def send(self, player, msg):
-            self.sent.append(msg)
-
-        def _active_humans(self, current_room):
-            return [p.username for p in current_room.players.values() if current_room.host_plays or p.username != current_room.host]
-
-        async def _initiate_toss(self, current_room):
-            return None
-
-    manager = DummyManager()
+    manager = _mock_manager()
 
     async def run():
         await start_match(manager, room, room.players["Host"])
@@ -84,53 +195,151 @@ def test_host_opt_out_excludes_from_lobby_and_match_start():
     assert room.players["Host"].is_captain is False
 
 
+def test_lobby_team_moves_keep_index_in_sync():
+    room = Room("ROOM4", "Host")
+    for name in ("Host", "Alice", "Bob"):
+        room.players[name] = PlayerConn(None, name)
+
+    manager = _mock_manager()
+    host = room.players["Host"]
+
+    async def run():
+        await assign_team(manager, room, host, {"player": "Alice", "team": "A"})
+        await assign_team(manager, room, host, {"player": "Alice", "team": "B"})
+        await set_captain(manager, room, host, {"team": "A", "captain": "Bob"})
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    manager.broadcast_lobby.assert_awaited_once_with(room)
+    assert room.teams == {"A": ["Bob"], "B": ["Alice"]}
+    assert room.player_team == {"Alice": "B", "Bob": "A"}
+    assert room.players["Alice"].team == "B"
+
+
+def test_delayed_timeout_fires_once_unless_cancelled():
+    room = Room("ROOMT", "Host")
+    fired = []
+
+    async def expire(tag):
+        fired.append(tag)
+
+    async def run():
+        _start_delayed_timeout(room, "captain_bat", 0.01, expire, "bat")
+        _start_delayed_timeout(room, "captain_bowl", 0.01, expire, "bowl")
+        assert _timeout_running(room, "captain_bat")
+        _cancel_timeout(room, "captain_bowl")
+        assert not _timeout_running(room, "captain_bowl")
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert fired == ["bat"]
+
+
+def test_forced_captain_pick_skips_prompt():
+    room = Room("ROOMF", "Host")
+    for name in ("H", "X", "Y"):
+        room.set_player_team(name, "A")
+    room.captains["A"] = "H"
+    innings = Innings(["H", "X", "Y"], ["C", "D"], total_overs=2, total_wickets=3, is_team_mode=True)
+    innings.apply_batter_choice("H")
+    innings.apply_bowler_choice("C")
+    innings.resolve_ball(4, 4)
+
+    manager = _mock_manager()
+    manager._is_cpu.side_effect = lambda current_room, username: True
+    manager._maybe_cpu_move.return_value = False
+    asyncio.run(_start_captain_batter_pick(manager, room, innings))
+    manager._send_match_state.assert_awaited_once()
+    manager.send.assert_not_awaited()
+    manager.broadcast.assert_not_awaited()
+    assert not innings.needs_batter_choice
+    assert innings.non_striker == "Y"
+    assert "captain_bat" not in room.pending_timeouts
+
+
+def test_side_captains_follow_captain_changes():
+    room = Room("ROOMC", "H")
+    for name in ("H", "X"):
+        room.set_player_team(name, "A")
+    for name in ("C", "D"):
+        room.set_player_team(name, "B")
+    room.captains.update({"A": "H", "B": "C"})
+    innings = Innings(["H", "X"], ["C", "D"], total_overs=1, total_wickets=1, is_team_mode=True)
+    assert _side_captains(room, innings) == ("H", "C")
+    # A captain leaving or handing over mid-innings is seen on the next lookup
+    room.captains["A"] = "X"
+    room.captains["B"] = None
+    assert _side_captains(room, innings) == ("X", None)
+    # Any membership change drops the cached side teams
+    room.set_player_team("H", None)
+    room.set_player_team("X", None)
+    assert _side_captains(room, innings) == (None, None)
+
+
+def test_backed_up_client_gets_latest_state_once_drained():
+    class SlowSocket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_text(self, text):
+            await asyncio.sleep(0.01)
+            self.sent.append(text)
+
+    manager = RoomManager()
+    player = PlayerConn(SlowSocket(), "Alice")
+    player.high_water = 5
+
+    async def run():
+        backlog = asyncio.create_task(manager._send_text(player, "X" * 10))
+        await asyncio.sleep(0)
+        await manager._send_text(player, "STATE 1", droppable=True)
+        await manager._send_text(player, "STATE 2", droppable=True)
+        await backlog
+
+    asyncio.run(run())
+    # The stale state is skipped, the newest one still arrives
+    assert player.ws.sent == ["X" * 10, "STATE 2"]
+    assert player.deferred_state is None
+
+
 def test_cpu_toss_timeout_fallback_triggers():
     room = Room("ROOM2", "Host")
     room.mode = "team"
     room.cpu_enabled = True
     room.cpu_names = ["CPU Bot"]
     room.cpu_history = {"CPU Bot": {"bat": [], "bowl": []}}
-    room.teams["A"] = ["CPU Bot"]
+    room.set_player_team("CPU Bot", "A")
     room.captains["A"] = "CPU Bot"
-    match = Match("M3", "team", ["CPU Bot"], ["Host"], total_overs=1, total_wickets=1)
-
-    def fixed_do_toss(caller=None):
-        match.toss_caller = "CPU Bot"
-        return {"caller": "CPU Bot"}
-
-    match.do_toss = fixed_do_toss
-    room.match = match
 
-    class DummyManager:
-        def __init__(self):
-            self.cpu_calls = 0
+    class FixedTossMatch(Match):
+        __slots__ = ()
 
-        async def send(self, player, msg):
-            return None
+        def do_toss(self, caller=None):
+            self.toss_caller = "CPU Bot"
+            return {"caller": "CPU Bot"}
 
-        def _is_cpu(self, current_room, username: str) -> bool:
-            return username in current_room.cpu_names
+    match = FixedTossMatch("M3", "team", ["CPU Bot"], ["Host"], total_overs=1, total_wickets=1)
+    room.match = match
 
-        def _team_for_player(self, current_room, username: str):
-            for team_key, members in current_room.teams.items():
-                if username in members:
-                    return team_key
-            return None
+    manager = _mock_manager()
+    fired = asyncio.Event()
 
-        async def _cpu_call_toss(self, current_room):
-            self.cpu_calls += 1
+    def count_toss_call(current_room):
+        # The immediate call plus the timeout fallback
+        if manager._cpu_call_toss.await_count >= 2:
+            fired.set()
 
-    manager = DummyManager()
+    manager._cpu_call_toss.side_effect = count_toss_call
     old_timeout = toss_module.CPU_PICK_TIMEOUT
     toss_module.CPU_PICK_TIMEOUT = 0.01
 
     async def run():
         await toss_module.initiate_toss(manager, room)
-        await asyncio.sleep(0.05)
+        await asyncio.wait_for(fired.wait(), timeout=1.0)
 
     asyncio.run(run())
     toss_module.CPU_PICK_TIMEOUT = old_timeout
-    assert manager.cpu_calls >= 2
+    assert manager._cpu_call_toss.await_count >= 2
 
 
 def test_cpu_toss_choice_timeout_fallback_triggers():
@@ -142,17 +351,7 @@ def test_cpu_toss_choice_timeout_fallback_triggers():
     match.toss_winner = "CPU Bot"
     room.match = match
 
-    class DummyManager:
-        def __init__(self):
-            self.cpu_choices = 0
-
-        def _is_cpu(self, current_room, username: str) -> bool:
-            return username in current_room.cpu_names
-
-        async def _cpu_choose_toss(self, current_room):
-            self.cpu_choices += 1
-
-    manager = DummyManager()
+    manager = _mock_manager()
     old_timeout = toss_module.CPU_PICK_TIMEOUT
     toss_module.CPU_PICK_TIMEOUT = 0.01
 
@@ -161,7 +360,7 @@ def test_cpu_toss_choice_timeout_fallback_triggers():
 
     asyncio.run(run())
     toss_module.CPU_PICK_TIMEOUT = old_timeout
-    assert manager.cpu_choices == 1
+    manager._cpu_choose_toss.assert_awaited_once_with(room)
 
 
 def test_cpu_autoplay_triggers_after_over_resolution():
@@ -181,50 +380,66 @@ def test_cpu_autoplay_triggers_after_over_resolution():
     innings = match.active_innings
     room.pending_moves = {"bat": 1, "bowl": 2}
 
-    class DummyManager:
-        def __init__(self):
-            self.auto_play_calls = 0
-            self.cpu_move_calls = 0
-
-        async def broadcast(self, current_room, msg, exclude=None):
-            return None
-
-        async def broadcast_lobby(self, current_room):
-            return None
-
-        async def _send_match_state(self, current_room):
-            return None
+    manager = _mock_manager()
 
-        async def _maybe_cpu_move(self, current_room, current_innings):
-            self.cpu_move_calls += 1
+    async def run():
+        await resolve_pending_ball(manager, room, innings)
 
-        async def _auto_play_cpu_match(self, current_room):
-            self.auto_play_calls += 1
+    asyncio.run(run())
+    manager._auto_play_cpu_match.assert_awaited_once_with(room)
+    manager._maybe_cpu_move.assert_awaited_once()
 
-        def _apply_tournament_result(self, current_room, current_match):
-            return {}
 
-        def _start_next_tournament_match(self, current_room):
-            return None
+def test_innings_transitions_follow_match_state():
+    room = Room("ROOM6", "Alice")
+    match = Match("M6", "tournament", ["Alice"], ["Bob"], total_overs=1, total_wickets=1)
+    match.toss_winner = "Alice"
+    match.apply_toss_choice("bat")
+    match.start_innings_1()
+    first = match.active_innings
+    first.resolve_ball(4, 1)
+    first.resolve_ball(2, 2)
 
-    manager = DummyManager()
+    extra, start_next = _next_innings_transition(room, match, first)
+    assert extra == {"target": 5}
+    assert start_next == match.start_innings_2
 
-    async def run():
-        await resolve_pending_ball(manager, room, innings)
+    start_next()
+    second = match.active_innings
+    second.resolve_ball(4, 1)
+    second.resolve_ball(3, 3)
+    # Level scores outside a playoff end the match
+    assert _next_innings_transition(room, match, second) is None
 
-    asyncio.run(run())
-    assert manager.auto_play_calls == 1
-    assert manager.cpu_move_calls == 1
+    room.tournament = Tournament(["Alice", "Bob", "Cara", "Dan"], overs=1, wickets=1)
+    room.tournament.phase = room.tournament.PHASE_FINAL
+    extra, start_next = _next_innings_transition(room, match, second)
+    assert extra["msg"] == "SUPER OVER: INNINGS 1"
+    assert start_next == match.start_innings_3
 
 
 def run_all_tests():
     test_innings_resolution()
+    test_super_over_snapshot_detached_from_card_cache()
+    test_hat_trick_detection()
+    test_captain_pick_options_follow_innings_state()
     test_match_flow_and_potm()
     test_tournament_awards()
+    test_round_robin_schedule_covers_every_pair()
+    test_round_robin_schedule_rests_players_between_matches()
+    for case in NRR_CASES:
+        test_standings_entry_nrr(*case)
+    test_group_result_updates_nrr()
     test_host_opt_out_excludes_from_lobby_and_match_start()
+    test_lobby_team_moves_keep_index_in_sync()
+    test_delayed_timeout_fires_once_unless_cancelled()
+    test_forced_captain_pick_skips_prompt()
+    test_side_captains_follow_captain_changes()
+    test_backed_up_client_gets_latest_state_once_drained()
     test_cpu_toss_timeout_fallback_triggers()
     test_cpu_toss_choice_timeout_fallback_triggers()
     test_cpu_autoplay_triggers_after_over_resolution()
+    test_innings_transitions_follow_match_state()
 
 
 if __name__ == "__main__":
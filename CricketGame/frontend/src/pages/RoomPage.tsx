@@ -314,7 +314,14 @@ export default function RoomPage({ token, username, onLogout }: Props) {
         ws.onmessage = (evt) => {
             try {
                 const msg = JSON.parse(evt.data)
-                handleWsMessageRef.current(msg)
+                if (msg.type === 'BATCH') {
+                    // Several server messages delivered in one frame, in order
+                    for (const item of msg.items as Record<string, unknown>[]) {
+                        handleWsMessageRef.current(item)
+                    }
+                } else {
+                    handleWsMessageRef.current(msg)
+                }
             } catch {
                 console.error('Invalid message from server')
             }